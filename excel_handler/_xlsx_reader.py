@@ -0,0 +1,203 @@
+"""
+Streaming reader for the cell data of .xlsx workbooks, shared by the gemini and
+o1pro handlers.
+
+The archive is opened with zipfile and each sheet's XML is parsed once with
+ElementTree, taking the cached value (<v>) and the formula (<f>) from the same
+<c> element. Values and formulas come out as openpyxl reports them (a
+data_only=True load for the values, a data_only=False load for the formulas);
+openpyxl's public helpers are used for the shared-strings table, the date
+styles, dates and shared formulas.
+"""
+
+import posixpath
+import xml.etree.ElementTree as ET
+
+from openpyxl.cell.text import Text
+from openpyxl.formula.translate import Translator
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils import get_column_letter, coordinate_to_tuple
+from openpyxl.utils.datetime import from_excel, from_ISO8601, WINDOWS_EPOCH, MAC_EPOCH
+from openpyxl.worksheet.formula import ArrayFormula, DataTableFormula
+
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CELL_TAG = f"{{{SHEET_MAIN_NS}}}c"
+_SHEET_DATA_TAG = f"{{{SHEET_MAIN_NS}}}sheetData"
+_ROW_TAG = f"{{{SHEET_MAIN_NS}}}row"
+_VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+_FORMULA_TAG = f"{{{SHEET_MAIN_NS}}}f"
+_INLINE_STRING_TAG = f"{{{SHEET_MAIN_NS}}}is"
+
+
+def _cast_number(value):
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _resolve_part(base_dir, target):
+    # Relationship targets are either absolute ("/xl/...") or relative to the source part
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def read_workbook_layout(zf):
+    """
+    Returns (sheets, parts, epoch): sheets is [(sheet_name, sheet_part_path), ...] in
+    workbook tab order, parts maps "sharedStrings"/"styles" to their archive paths.
+    Chartsheets and dialogsheets hold no cell data and are left out of sheets.
+    """
+    workbook_part = "xl/workbook.xml"
+    root_rels = ET.fromstring(zf.read("_rels/.rels"))
+    for rel in root_rels.iter(f"{{{PKG_REL_NS}}}Relationship"):
+        if rel.get("Type", "").endswith("/officeDocument"):
+            workbook_part = _resolve_part("", rel.get("Target"))
+            break
+
+    workbook_dir, workbook_name = posixpath.split(workbook_part)
+    rels_part = posixpath.join(workbook_dir, "_rels", f"{workbook_name}.rels")
+    targets = {}
+    parts = {}
+    for rel in ET.fromstring(zf.read(rels_part)).iter(f"{{{PKG_REL_NS}}}Relationship"):
+        rel_type = rel.get("Type", "").rsplit("/", 1)[-1]
+        target = _resolve_part(workbook_dir, rel.get("Target"))
+        targets[rel.get("Id")] = (rel_type, target)
+        if rel_type in ("sharedStrings", "styles"):
+            parts[rel_type] = target
+
+    workbook_root = ET.fromstring(zf.read(workbook_part))
+    epoch = WINDOWS_EPOCH
+    workbook_pr = workbook_root.find(f"{{{SHEET_MAIN_NS}}}workbookPr")
+    if workbook_pr is not None and workbook_pr.get("date1904") in ("1", "true"):
+        epoch = MAC_EPOCH
+
+    sheets = []
+    for sheet in workbook_root.iter(f"{{{SHEET_MAIN_NS}}}sheet"):
+        rel_type, sheet_part = targets.get(sheet.get(f"{{{DOC_REL_NS}}}id"), (None, None))
+        if rel_type == "worksheet":
+            sheets.append((sheet.get("name"), sheet_part))
+    return sheets, parts, epoch
+
+
+def read_date_styles(zf, styles_part):
+    """Returns (date_formats, timedelta_formats): the style ids of date and duration cells."""
+    if styles_part is None or styles_part not in zf.NameToInfo:
+        return set(), set()
+    stylesheet = Stylesheet.from_tree(ET.fromstring(zf.read(styles_part)))
+    return stylesheet.date_formats, stylesheet.timedelta_formats
+
+
+def read_shared_strings(zf, shared_strings_part):
+    if shared_strings_part is None or shared_strings_part not in zf.NameToInfo:
+        return []
+    with zf.open(shared_strings_part) as src:
+        return read_string_table(src)
+
+
+def new_string_pool(shared_strings):
+    # Seeded with the shared-strings table so inline/formula text equal to a shared
+    # string reuses that object too
+    return {text: text for text in shared_strings}
+
+
+def iter_sheet_cells(zf, sheet_part, shared_strings, date_formats, timedelta_formats, epoch, string_pool):
+    """
+    Yields (row_idx, col_idx, cached_value, formula) for every <c> element of a sheet,
+    reading the <v> and <f> children from the same element so the sheet XML is
+    only decompressed and parsed once.
+
+    cached_value is the cell's value, or for a formula cell the result cached in the
+    file; None when the cell has neither. formula is "" for a cell without <f>,
+    "=..." otherwise ("=" for an empty <f/>), and an ArrayFormula/DataTableFormula
+    object for array and data-table formulas, as openpyxl returns them.
+
+    Formulas, inline strings and formula string results are deduplicated through
+    string_pool, so repeated text shares one str object the way shared strings do.
+    """
+    def intern_string(text):
+        return string_pool.setdefault(text, text)
+
+    shared_formulae = {}
+    row_idx = 0
+    col_idx = 0
+    sheet_data_elem = None
+    with zf.open(sheet_part) as src:
+        for event, elem in ET.iterparse(src, events=("start", "end")):
+            tag = elem.tag
+            if tag == _ROW_TAG:
+                if event == "start":
+                    r = elem.get("r")
+                    if r is None:
+                        row_idx += 1
+                    else:
+                        row_idx = int(float(r)) if "." in r else int(r)
+                    col_idx = 0
+                elif sheet_data_elem is not None:
+                    # Detach finished rows too; clearing them alone still leaves one
+                    # empty <row> element per row hanging off <sheetData>
+                    sheet_data_elem.clear()
+                else:
+                    elem.clear()
+                continue
+            if tag == _SHEET_DATA_TAG and event == "start":
+                sheet_data_elem = elem
+                continue
+            if tag != _CELL_TAG or event != "end":
+                continue
+
+            coordinate = elem.get("r")
+            if coordinate:
+                row_idx, col_idx = coordinate_to_tuple(coordinate)
+            else:
+                col_idx += 1
+                coordinate = get_column_letter(col_idx) + str(row_idx)
+
+            data_type = elem.get("t", "n")
+            formula = ""
+            formula_elem = elem.find(_FORMULA_TAG)
+            if formula_elem is not None:
+                formula_type = formula_elem.get("t")
+                formula = "=" + (formula_elem.text or "")
+                if formula_type == "array":
+                    formula = ArrayFormula(ref=formula_elem.get("ref"), text=formula)
+                elif formula_type == "dataTable":
+                    formula = DataTableFormula(**formula_elem.attrib)
+                else:
+                    if formula_type == "shared":
+                        idx = formula_elem.get("si")
+                        if idx in shared_formulae:
+                            formula = shared_formulae[idx].translate_formula(coordinate)
+                        elif formula != "=":
+                            shared_formulae[idx] = Translator(formula, coordinate)
+                    formula = intern_string(formula)
+
+            value = None
+            if data_type == "inlineStr":
+                inline = elem.find(_INLINE_STRING_TAG)
+                if inline is not None:
+                    value = intern_string(Text.from_tree(inline).content)
+            else:
+                raw = elem.findtext(_VALUE_TAG) or None
+                if raw is not None:
+                    if data_type == "n":
+                        value = _cast_number(raw)
+                        style_id = int(elem.get("s", 0))
+                        if style_id in date_formats:
+                            try:
+                                value = from_excel(value, epoch, timedelta=style_id in timedelta_formats)
+                            except (OverflowError, ValueError):
+                                value = "#VALUE!"
+                    elif data_type == "s":
+                        value = shared_strings[int(raw)]
+                    elif data_type == "b":
+                        value = bool(int(raw))
+                    elif data_type == "d":
+                        value = from_ISO8601(raw)
+                    else: # "str" (formula string result) and "e" (error) are kept as text
+                        value = intern_string(raw)
+            elem.clear()
+            yield row_idx, col_idx, value, formula
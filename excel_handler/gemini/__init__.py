@@ -2,20 +2,30 @@
 from .excel_handler_gemini import (
     read_excel_file_data,
     compare_excel_data,
+    iter_excel_differences,
     create_demo_excel_file,
     compare_excel_files_e2e,
     main,
     write_excel_data_to_txt,
-    write_comparison_summary_to_txt
+    write_comparison_summary_to_txt,
+    write_differences_to_jsonl,
+    write_comparison_to_json,
+    to_json_bytes,
+    from_json_bytes
 )
 
 # Define __all__ to specify the public API
 __all__ = [
     'read_excel_file_data',
     'compare_excel_data',
+    'iter_excel_differences',
     'create_demo_excel_file',
     'compare_excel_files_e2e',
     'main',
     'write_excel_data_to_txt',
-    'write_comparison_summary_to_txt'
+    'write_comparison_summary_to_txt',
+    'write_differences_to_jsonl',
+    'write_comparison_to_json',
+    'to_json_bytes',
+    'from_json_bytes'
 ] 
\ No newline at end of file
@@ -1,80 +1,316 @@
 import openpyxl
+import io
 import os
+import sys
 import json
+import hashlib
+import functools
+import pickle
+import re
+import zipfile
 from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import get_column_letter, coordinate_to_tuple
 import datetime
-import pytz # Import pytz for timezone handling
+try:
+    from zoneinfo import ZoneInfo # Python 3.9+; pytz is only needed without it
+except ImportError:
+    ZoneInfo = None
 import argparse # Import argparse for command-line arguments
 import time # Import time for potential retries
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from array import array
+from bisect import bisect_left
+import heapq
+from collections.abc import ItemsView, Mapping
+from itertools import compress, repeat
+from operator import eq, is_, is_not, itemgetter, ne, or_
+
+from excel_handler._xlsx_reader import (
+    iter_sheet_cells,
+    new_string_pool,
+    read_date_styles,
+    read_shared_strings,
+    read_workbook_layout,
+)
+
+# --- Columnar Sheet Storage ---
+
+_COL_BITS = 15 # Excel's last column (XFD) is 16384 == 1 << 14, so it needs 15 bits
+_COL_MASK = (1 << _COL_BITS) - 1
+_END_KEY = 1 << 62 # Sorts after every real cell key
+
+def _cell_key(row_idx, col_idx):
+    # Packs (row, col) into one int whose numeric order is row-major order
+    return (row_idx << _COL_BITS) | col_idx
+
+_COLUMN_LETTERS = [""] # _COLUMN_LETTERS[col_idx] == get_column_letter(col_idx), grown on demand
+
+def _column_letters(max_col):
+    letters = _COLUMN_LETTERS
+    if len(letters) <= max_col:
+        letters.extend(get_column_letter(col_idx) for col_idx in range(len(letters), max_col + 1))
+    return letters
+
+def _coord_from_key(key):
+    col_idx = key & _COL_MASK
+    return _column_letters(col_idx)[col_idx] + str(key >> _COL_BITS)
+
+class SheetData(Mapping):
+    """
+    Cells of one sheet stored as parallel arrays (packed row/col keys, display
+    values, formulas) kept in row-major order. Behaves as a read-only
+    {"A1": {"value": ..., "formula": ...}} mapping; the per-cell dicts and the
+    coordinate strings are only built when a cell is accessed.
+    """
 
-# --- Core Data Extraction Functions (Unchanged) ---
-
-def get_cell_data(cell_value, cell_formula):
-    formula_str = ""
-    if isinstance(cell_formula, str) and cell_formula.startswith('='):
-        formula_str = cell_formula
-    display_value = cell_value if cell_value is not None else '[empty]'
-    return {"value": display_value, "formula": formula_str}
+    def __init__(self):
+        self.cell_keys = array('q')
+        self.cell_values = []
+        self.cell_formulas = []
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Builds a SheetData from a {coordinate: {"value": ..., "formula": ...}} dict."""
+        if isinstance(cells, cls):
+            return cells
+        sheet = cls()
+        keyed = sorted((_cell_key(*coordinate_to_tuple(coord)), coord) for coord in cells)
+        for key, coord in keyed:
+            cell_info = cells[coord]
+            sheet.cell_keys.append(key)
+            sheet.cell_values.append(cell_info["value"])
+            sheet.cell_formulas.append(cell_info["formula"])
+        return sheet
+
+    def append(self, row_idx, col_idx, value, formula):
+        # Readers emit cells in row-major order, which keeps cell_keys sorted
+        self.cell_keys.append(_cell_key(row_idx, col_idx))
+        self.cell_values.append(value)
+        self.cell_formulas.append(formula)
+
+    def _index(self, cell_coord):
+        try:
+            key = _cell_key(*coordinate_to_tuple(cell_coord))
+        except (TypeError, ValueError, AttributeError):
+            return -1
+        idx = bisect_left(self.cell_keys, key)
+        if idx < len(self.cell_keys) and self.cell_keys[idx] == key:
+            return idx
+        return -1
+
+    def __getitem__(self, cell_coord):
+        idx = self._index(cell_coord)
+        if idx < 0:
+            raise KeyError(cell_coord)
+        return {"value": self.cell_values[idx], "formula": self.cell_formulas[idx]}
+
+    def __contains__(self, cell_coord):
+        return self._index(cell_coord) >= 0
+
+    def __iter__(self):
+        # One lookup table for the whole sheet instead of a base-26 conversion per cell,
+        # and one str(row) per row rather than per cell (keys are in row-major order)
+        letters = _column_letters(max(map(_COL_MASK.__and__, self.cell_keys), default=0))
+        last_row_idx, row_str = -1, ""
+        for key in self.cell_keys:
+            row_idx = key >> _COL_BITS
+            if row_idx != last_row_idx:
+                last_row_idx, row_str = row_idx, str(row_idx)
+            yield letters[key & _COL_MASK] + row_str
+
+    def __len__(self):
+        return len(self.cell_keys)
+
+    def items(self):
+        return _SheetItemsView(self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+class _SheetItemsView(ItemsView):
+    # Same (coordinate, cell dict) pairs as Mapping.items(), walked straight off the
+    # columns instead of one coordinate parse and bisect lookup per cell
+    def __iter__(self):
+        sheet = self._mapping
+        return zip(sheet, ({"value": value, "formula": formula}
+                           for value, formula in zip(sheet.cell_values, sheet.cell_formulas)))
+
+# --- Core Data Extraction Functions ---
 
 def read_worksheet_data(ws_values, ws_formulas):
-    sheet_data = {}
-    max_row = ws_formulas.max_row
-    max_col = ws_formulas.max_column
-    if max_row is None or max_col is None or max_row == 0 or max_col == 0:
-         return {}
-
-    total_cells = max_row * max_col
-    if total_cells > 1000:  # Only show detailed progress for large sheets
-        print(f"    Reading large sheet with {max_row} rows x {max_col} columns ({total_cells} cells)")
-        
-    cells_with_data = 0
-    for row_idx in range(1, max_row + 1):
-        for col_idx in range(1, max_col + 1):
-            cell_coord = f"{get_column_letter(col_idx)}{row_idx}"
-            cell_formulas_obj = ws_formulas.cell(row=row_idx, column=col_idx)
-            formula_content = cell_formulas_obj.value
-            cell_values_obj = ws_values.cell(row=row_idx, column=col_idx)
-            evaluated_value = cell_values_obj.value
-
-            if evaluated_value is not None or (isinstance(formula_content, str) and formula_content.startswith('=')):
-                 cell_info = get_cell_data(evaluated_value, formula_content)
-                 sheet_data[cell_coord] = cell_info
-                 cells_with_data += 1
-
-    print(f"    Found {cells_with_data} cell(s) with data out of {total_cells} total cells")
+    sheet_data = SheetData()
+
+    # The <dimension> ref written by some producers is stale; left in place, read-only
+    # iteration pads every row out to it (or truncates at it). Without it only the
+    # rows and cells present in the sheet XML are yielded.
+    ws_values.reset_dimensions()
+    ws_formulas.reset_dimensions()
+
+    # Stream both views row by row instead of calling .cell() per coordinate, which
+    # makes read-only worksheets re-scan the sheet XML on every lookup
+    rows = zip(ws_values.iter_rows(values_only=True), ws_formulas.iter_rows())
+    for row_idx, (row_values, row_formula_cells) in enumerate(rows, 1):
+        for col_idx, (evaluated_value, formula_cell) in enumerate(zip(row_values, row_formula_cells), 1):
+            formula_content = formula_cell.value
+            if formula_content is None and evaluated_value is None:
+                continue # Gap cell padded in by iter_rows
+            # Only cells with an <f> count as formulas, as in the streaming reader; a text
+            # cell that merely starts with '=' (e.g. a quote-prefixed '=abc) does not
+            formula_str = formula_content if formula_cell.data_type == 'f' and type(formula_content) is str else ""
+            if evaluated_value is not None:
+                 sheet_data.append(row_idx, col_idx, evaluated_value, formula_str)
+            elif formula_str:
+                 sheet_data.append(row_idx, col_idx, '[empty]', formula_str)
+
+    print(f"    Found {len(sheet_data)} cell(s) with data")
     return sheet_data
 
-def read_excel_file_data(filepath):
-    wb_values = None
-    wb_formulas = None
-    try:
-        retries = 3
-        delay = 0.5 # seconds
-        last_error = None
-        for i in range(retries):
+# --- Streaming XLSX Reader (single pass over each sheet's XML) ---
+
+def _read_sheet_xml(zf, sheet_part, shared_strings, date_formats, timedelta_formats, epoch, string_pool):
+    sheet_data = SheetData()
+    # Append straight to the columns. iter_sheet_cells already yields formulas as
+    # "" or "=...", so the only fix-ups left are array/data-table formulas and the
+    # '[empty]' placeholder.
+    append_key = sheet_data.cell_keys.append
+    append_value = sheet_data.cell_values.append
+    append_formula = sheet_data.cell_formulas.append
+    in_order = True
+    last_key = -1
+    for row_idx, col_idx, evaluated_value, formula_content in iter_sheet_cells(
+            zf, sheet_part, shared_strings, date_formats, timedelta_formats, epoch, string_pool):
+        if formula_content.__class__ is not str:
+            # Same as the openpyxl fallback: read_worksheet_data does not count the
+            # ArrayFormula/DataTableFormula objects openpyxl returns as formulas
+            formula_content = ""
+        if evaluated_value is None:
+            if not formula_content:
+                continue
+            evaluated_value = '[empty]'
+        key = (row_idx << _COL_BITS) | col_idx
+        if key <= last_key:
+            in_order = False
+        last_key = key
+        append_key(key)
+        append_value(evaluated_value)
+        append_formula(formula_content)
+    if not in_order:
+        sheet_data = _in_row_major_order(sheet_data)
+    return sheet_data
+
+def _in_row_major_order(sheet_data):
+    # Only needed for sheet XML that lists rows or cells out of order: the lookups and
+    # the sheet diff rely on sorted, unique keys. A cell listed more than once keeps
+    # the last value and formula given for it.
+    latest = {key: idx for idx, key in enumerate(sheet_data.cell_keys)}
+    ordered = SheetData()
+    for key in sorted(latest):
+        idx = latest[key]
+        ordered.cell_keys.append(key)
+        ordered.cell_values.append(sheet_data.cell_values[idx])
+        ordered.cell_formulas.append(sheet_data.cell_formulas[idx])
+    return ordered
+
+# Worker processes only pay off once there is enough sheet XML to amortise starting them
+_PARALLEL_MIN_SHEET_BYTES = 8 * 1024 * 1024
+_sheet_worker_state = {}
+
+def _init_sheet_worker(filepath, shared_strings, date_formats, timedelta_formats, epoch):
+    # Runs once per worker: the archive handle and the shared-strings table are reused
+    # for every sheet that worker parses
+    _sheet_worker_state["zf"] = zipfile.ZipFile(filepath)
+    _sheet_worker_state["parse_args"] = (shared_strings, date_formats, timedelta_formats, epoch)
+    _sheet_worker_state["string_pool"] = new_string_pool(shared_strings)
+
+def _read_sheet_xml_in_worker(sheet_part):
+    return _read_sheet_xml(_sheet_worker_state["zf"], sheet_part, *_sheet_worker_state["parse_args"],
+                           _sheet_worker_state["string_pool"])
+
+def _should_read_sheets_in_parallel(zf, sheet_parts):
+    # Inside a file-level worker the CPUs are already shared out between the files
+    if _in_file_worker or len(sheet_parts) < 2 or (os.cpu_count() or 1) < 2:
+        return False
+    return sum(zf.getinfo(part).file_size for part in sheet_parts) >= _PARALLEL_MIN_SHEET_BYTES
+
+def _read_sheets_in_parallel(filepath, sheet_parts, parse_args):
+    max_workers = min(len(sheet_parts), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sheet_worker,
+                             initargs=(filepath,) + parse_args) as executor:
+        return list(executor.map(_read_sheet_xml_in_worker, sheet_parts))
+
+def _open_with_retries(opener, filepath, retries=3, base_delay=0.25):
+    # Transient OS errors (e.g. a workbook still locked by Excel on Windows) are retried
+    # with exponential backoff; a missing file or a corrupt archive fails straight away
+    for i in range(retries):
+        try:
+            return opener(filepath)
+        except (FileNotFoundError, IsADirectoryError):
+            raise
+        except OSError as e_inner:
+            if i == retries - 1:
+                print(f"  Failed to read {filepath} after {retries} attempts.")
+                raise
+            print(f"  Retrying read for {filepath} after error: {e_inner}")
+            time.sleep(base_delay * (2 ** i))
+
+def _read_file_bytes(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+def _read_excel_file_data_xml(filepath):
+    with _open_with_retries(zipfile.ZipFile, filepath) as zf:
+        sheets, parts, epoch = read_workbook_layout(zf)
+        if not sheets:
+            print(f"  Warning: No sheets found in '{filepath}'.")
+            return {}
+        shared_strings = read_shared_strings(zf, parts.get("sharedStrings"))
+        date_formats, timedelta_formats = read_date_styles(zf, parts.get("styles"))
+        parse_args = (shared_strings, date_formats, timedelta_formats, epoch)
+        sheet_parts = [sheet_part for _, sheet_part in sheets]
+
+        total_sheets = len(sheets)
+        print(f"  Found {total_sheets} sheet(s) in '{filepath}'")
+        sheet_contents = None
+        if _should_read_sheets_in_parallel(zf, sheet_parts):
+            print(f"  Parsing {total_sheets} sheets in parallel worker processes")
             try:
-                wb_values = openpyxl.load_workbook(filepath, data_only=True, read_only=True)
-                wb_formulas = openpyxl.load_workbook(filepath, data_only=False, read_only=True)
-                last_error = None
-                break
-            except Exception as e_inner:
-                last_error = e_inner
-                if wb_values: wb_values.close()
-                if wb_formulas: wb_formulas.close()
-                wb_values, wb_formulas = None, None
-                if i < retries - 1:
-                    print(f"  Retrying read for {filepath} after error: {e_inner}")
-                    time.sleep(delay)
-                else:
-                    print(f"  Failed to read {filepath} after {retries} attempts.")
+                sheet_contents = _read_sheets_in_parallel(filepath, sheet_parts, parse_args)
+            except (OSError, BrokenProcessPool) as e_pool:
+                print(f"  Parallel sheet parsing unavailable ({e_pool}). Parsing sheets sequentially.")
+        if sheet_contents is None:
+            string_pool = new_string_pool(shared_strings)
+            sheet_contents = (_read_sheet_xml(zf, sheet_part, *parse_args, string_pool) for sheet_part in sheet_parts)
 
-        if wb_values is None or wb_formulas is None:
-             if last_error:
-                  raise last_error
-             else:
-                  raise Exception(f"Failed to load workbook '{filepath}' for unknown reasons after retries.")
+        all_excel_data = {}
+        for sheet_idx, ((sheet_name, _), sheet_content) in enumerate(zip(sheets, sheet_contents), 1):
+            print(f"  Processing sheet {sheet_idx}/{total_sheets}: '{sheet_name}'...")
+            print(f"    Found {len(sheet_content)} cell(s) with data")
+            if not sheet_content:
+                print(f"  Sheet '{sheet_name}' appears empty or contains no data/formulas. Adding as empty.")
+            all_excel_data[sheet_name] = sheet_content
+        return all_excel_data
 
+# --- openpyxl Reader (fallback for workbooks the streaming reader cannot parse) ---
+
+def _read_excel_file_data_openpyxl(filepath):
+    wb_values = None
+    wb_formulas = None
+    try:
+        # Only reading the file can fail transiently. Each BytesIO view shares the same
+        # bytes object without copying it, so both loads then parse the archive from
+        # memory, and a load that fails on those bytes would fail again on a retry
+        workbook_bytes = _open_with_retries(_read_file_bytes, filepath)
+        # The value and formula loads are independent, so run them side by side
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            load_futures = [pool.submit(openpyxl.load_workbook, io.BytesIO(workbook_bytes),
+                                        data_only=data_only, read_only=True, keep_links=False)
+                            for data_only in (True, False)]
+        # Keep whichever load succeeded so the finally block can close it, then
+        # re-raise the first failure
+        wb_values, wb_formulas = (None if fut.exception() else fut.result() for fut in load_futures)
+        for fut in load_futures:
+            fut.result()
 
         all_excel_data = {}
         sheet_names = wb_formulas.sheetnames
@@ -84,9 +320,11 @@ def read_excel_file_data(filepath):
 
         total_sheets = len(sheet_names)
         print(f"  Found {total_sheets} sheet(s) in '{filepath}'")
-        
+        # .sheetnames builds a new list on every access; look names up in one set instead
+        value_sheet_names = set(wb_values.sheetnames)
+
         for sheet_idx, sheet_name in enumerate(sheet_names, 1):
-            if sheet_name in wb_values.sheetnames:
+            if sheet_name in value_sheet_names:
                 ws_values = wb_values[sheet_name]
                 ws_formulas = wb_formulas[sheet_name]
                 print(f"  Processing sheet {sheet_idx}/{total_sheets}: '{sheet_name}'...")
@@ -101,19 +339,267 @@ def read_excel_file_data(filepath):
 
         return all_excel_data
 
+    finally:
+        if wb_values:
+            wb_values.close()
+        if wb_formulas:
+            wb_formulas.close()
+
+# --- Parse Cache (content-addressed pickles under .cache/) ---
+
+_CACHE_VERSION = 1 # Bump whenever the reader's output or the entry naming changes so old entries are ignored
+_CACHE_DIR = ".cache"
+
+def _file_digest(filepath, digest=hashlib.sha256):
+    with open(filepath, 'rb') as f:
+        if hasattr(hashlib, "file_digest"): # Python 3.11+
+            return hashlib.file_digest(f, digest).digest()
+        file_hash = digest()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_hash.update(chunk)
+        return file_hash.digest()
+
+def _cache_path_prefix(filepath):
+    # '<name>.<hash of the absolute path>': workbooks that share a name in different
+    # folders (v1/report.xlsx vs v2/report.xlsx) get separate entries
+    path_hash = hashlib.blake2b(os.path.abspath(filepath).encode("utf-8", "surrogatepass"),
+                                digest_size=8).hexdigest()
+    return f"{os.path.basename(filepath)}.{path_hash}"
+
+def _cache_path(filepath, content_digest=None):
+    # Keyed on the file's contents, so an unchanged workbook hits the cache no matter
+    # how it was touched, and any edit misses it. content_digest is the file's SHA-256
+    # digest when the caller has already hashed it, which saves another pass over it
+    if content_digest is None:
+        content_digest = _file_digest(filepath)
+    content_hash = content_digest.hex()[:32]
+    return os.path.join(_CACHE_DIR, f"{_cache_path_prefix(filepath)}.{content_hash}.v{_CACHE_VERSION}.pkl")
+
+def _load_cached_file_data(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"  Ignoring unreadable parse cache '{cache_path}': {e}")
+        return None
+
+def _store_cached_file_data(filepath, cache_path, excel_data):
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        # Keep one entry per workbook path: drop the entries of earlier versions of it
+        stale_entry = re.compile(re.escape(_cache_path_prefix(filepath)) + r"\.[0-9a-f]{32}\.v\d+\.pkl")
+        for entry in os.listdir(_CACHE_DIR):
+            if stale_entry.fullmatch(entry):
+                try:
+                    os.remove(os.path.join(_CACHE_DIR, entry))
+                except FileNotFoundError:
+                    pass # Already dropped by a concurrent reader of the same workbook
+        temp_path = f"{cache_path}.{os.getpid()}.tmp" # Unique per worker process
+        with open(temp_path, 'wb') as f:
+            pickle.dump(excel_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        print(f"  Could not write parse cache '{cache_path}': {e}")
+
+def _read_excel_file_data_uncached(filepath):
+    try:
+        return _read_excel_file_data_xml(filepath)
+    except (FileNotFoundError, zipfile.BadZipFile):
+        raise
+    except Exception as e_xml:
+        print(f"  Streaming reader could not parse '{filepath}' ({e_xml}). Falling back to openpyxl.")
+    return _read_excel_file_data_openpyxl(filepath)
+
+def read_excel_file_data(filepath, use_cache=False, content_digest=None):
+    """
+    Reads every sheet of an .xlsx file into {sheet_name: {coord: {"value", "formula"}}}.
+
+    With use_cache=True the parsed result is pickled to
+    '.cache/<name>.<path hash>.<content hash>.v<N>.pkl' and reused by later calls on the
+    same file path with the same contents, skipping the ZIP/XML parse entirely. Only
+    enable it where the .cache directory is trusted: entries are loaded with pickle.
+    A caller that has already computed the file's SHA-256 digest can pass it as
+    content_digest so the file is not hashed a second time for the cache lookup.
+    """
+    try:
+        if not use_cache:
+            return _read_excel_file_data_uncached(filepath)
+        # Hashed before parsing, so a file rewritten mid-read is cached under its old contents
+        cache_path = _cache_path(filepath, content_digest)
+        cached_data = _load_cached_file_data(cache_path)
+        if cached_data is not None:
+            print(f"  Loaded parsed data for '{filepath}' from cache '{cache_path}'")
+            return cached_data
+        excel_data = _read_excel_file_data_uncached(filepath)
+        _store_cached_file_data(filepath, cache_path, excel_data)
+        return excel_data
+
     except FileNotFoundError:
         print(f"Error: File not found at '{filepath}'")
         return None
     except Exception as e:
         print(f"Error reading Excel file '{filepath}': {e}")
         return None
-    finally:
-        if wb_values:
-            wb_values.close()
-        if wb_formulas:
-            wb_formulas.close()
 
-# --- Comparison Function (Unchanged) ---
+# --- JSON Interchange ---
+
+def _json_default(obj):
+    # SheetData becomes a plain object; dates, times and anything else openpyxl hands
+    # back are written the way the text reports print them
+    if isinstance(obj, Mapping):
+        return dict(obj.items())
+    return str(obj)
+
+# One shared encoder: json.dumps() builds a new JSONEncoder on every call that passes
+# options. Compact UTF-8 output is also smaller and quicker to produce than the default
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+def to_json_bytes(excel_data):
+    """
+    Serialises read_excel_file_data() output to compact UTF-8 JSON, a pickle-free
+    form for handing parsed workbooks to other processes or tools. Non-JSON values
+    (dates, times) are stored as their str() form.
+    """
+    return _JSON_ENCODER.encode(excel_data).encode("utf-8")
+
+def from_json_bytes(raw):
+    """
+    Loads to_json_bytes() output back into {sheet_name: {coord: {"value", "formula"}}}
+    dicts, which compare_excel_data() and the report writers accept as-is.
+    """
+    return json.loads(raw)
+
+# Separate processes per workbook only pay off once the files are big enough to outweigh
+# starting the workers and pickling the parsed sheets back
+_PARALLEL_MIN_FILE_BYTES = 4 * 1024 * 1024
+# Set to 0 to always read files one after another, e.g. where concurrent reads of
+# two large files thrash a spinning disk
+_PARALLEL_IO_ENV = "EXCEL_HANDLER_PARALLEL_IO"
+_in_file_worker = False
+
+def _init_file_worker():
+    global _in_file_worker
+    _in_file_worker = True
+
+def _read_excel_files_data(filepaths, use_cache=False, content_digests=None):
+    if content_digests is None:
+        content_digests = [None] * len(filepaths)
+    try:
+        read_in_parallel = (len(filepaths) > 1 and (os.cpu_count() or 1) >= 2 and
+                            os.environ.get(_PARALLEL_IO_ENV, "1") != "0" and
+                            sum(os.path.getsize(path) for path in filepaths) >= _PARALLEL_MIN_FILE_BYTES)
+    except OSError:
+        read_in_parallel = False # A missing file is reported by read_excel_file_data
+    if read_in_parallel:
+        print(f"  Reading {len(filepaths)} files in parallel worker processes")
+        try:
+            with ProcessPoolExecutor(max_workers=len(filepaths), initializer=_init_file_worker) as executor:
+                return list(executor.map(read_excel_file_data, filepaths, [use_cache] * len(filepaths),
+                                         content_digests))
+        except (OSError, BrokenProcessPool) as e_pool:
+            print(f"  Parallel file reading unavailable ({e_pool}). Reading files sequentially.")
+    return [read_excel_file_data(path, use_cache=use_cache, content_digest=digest)
+            for path, digest in zip(filepaths, content_digests)]
+
+# --- Comparison Function ---
+
+def _align_sheet_cells(keys1, keys2):
+    """
+    Returns (common1, common2, only1, only2) index lists for two sorted key arrays.
+    Sheets with the same cell layout (the usual case) are detected with a single
+    array compare and skip the merge.
+    """
+    if keys1 == keys2:
+        common = range(len(keys1))
+        return common, common, (), ()
+    common1, common2, only1, only2 = [], [], [], []
+    n1, n2 = len(keys1), len(keys2)
+    i = j = 0
+    while i < n1 or j < n2:
+        key1 = keys1[i] if i < n1 else _END_KEY
+        key2 = keys2[j] if j < n2 else _END_KEY
+        if key1 == key2:
+            common1.append(i)
+            common2.append(j)
+            i += 1
+            j += 1
+        elif key1 < key2:
+            only1.append(i)
+            i += 1
+        else:
+            only2.append(j)
+            j += 1
+    return common1, common2, only1, only2
+
+def _iter_sheet_diffs(sheet_data1, sheet_data2):
+    keys1, values1, formulas1 = sheet_data1.cell_keys, sheet_data1.cell_values, sheet_data1.cell_formulas
+    keys2, values2, formulas2 = sheet_data2.cell_keys, sheet_data2.cell_values, sheet_data2.cell_formulas
+    # Unchanged sheets (the bulk of a near-identical workbook pair) end here after a few
+    # C-level list compares; the type check keeps 1 vs 1.0 or True vs 1 reported, and
+    # float pairs still compare their str() forms since 0.0 == -0.0 but prints differently
+    if keys1 == keys2 and formulas1 == formulas2 and values1 == values2:
+        types1 = list(map(type, values1))
+        if types1 == list(map(type, values2)):
+            floats = list(map(is_, types1, repeat(float)))
+            if all(map(eq, map(str, compress(values1, floats)), map(str, compress(values2, floats)))):
+                return
+    common1, common2, only1, only2 = _align_sheet_cells(keys1, keys2)
+
+    if isinstance(common1, range):
+        aligned1, aligned2 = values1, values2
+        aligned_formulas1, aligned_formulas2 = formulas1, formulas2
+    else:
+        aligned1, aligned2 = list(map(values1.__getitem__, common1)), list(map(values2.__getitem__, common2))
+        aligned_formulas1 = list(map(formulas1.__getitem__, common1))
+        aligned_formulas2 = list(map(formulas2.__getitem__, common2))
+
+    # Typed pre-filter, built with C-level map() pipelines: a same-typed non-float pair
+    # that compares equal also has equal str() forms, so only cells whose raw values or
+    # types differ, float cells (0.0 == -0.0, yet their str() forms differ) and cells
+    # whose formulas differ go through the str() comparison below
+    types1 = list(map(type, aligned1))
+    maybe_differ = map(or_, map(or_, map(or_, map(ne, aligned1, aligned2),
+                                            map(is_not, types1, map(type, aligned2))),
+                                map(is_, types1, repeat(float))),
+                       map(ne, aligned_formulas1, aligned_formulas2))
+    differing = ((i, j) for i, j in compress(zip(common1, common2), maybe_differ)
+                 if str(values1[i]) != str(values2[j]) or formulas1[i] != formulas2[j])
+
+    changed = ((keys1[i], {
+        "file1": {"value": values1[i], "formula": formulas1[i]},
+        "file2": {"value": values2[j], "formula": formulas2[j]}
+    }) for i, j in differing)
+    removed = ((keys1[i], {
+        "file1": {"value": values1[i], "formula": formulas1[i]},
+        "file2": {"value": "[missing]", "formula": ""}
+    }) for i in only1 if str(values1[i]) != "[missing]" or formulas1[i])
+    added = ((keys2[j], {
+        "file1": {"value": "[missing]", "formula": ""},
+        "file2": {"value": values2[j], "formula": formulas2[j]}
+    }) for j in only2 if str(values2[j]) != "[missing]" or formulas2[j])
+
+    # Each stream is already in row-major key order, so a k-way merge yields the
+    # combined diff in order without re-sorting it
+    for key, entry in heapq.merge(changed, removed, added, key=itemgetter(0)):
+        yield _coord_from_key(key), entry
+
+def iter_excel_differences(data1, data2):
+    """
+    Lazily yields (sheet_name, cell_coord, diff_entry) for every differing cell of
+    the sheets common to data1 and data2 (sheets in sorted order, cells in row-major
+    order). diff_entry has the same {"file1": ..., "file2": ...} shape as the
+    entries of compare_excel_data(), but no diff dict is ever held in memory.
+    """
+    common_sheets = sorted(sheet_name for sheet_name in data1 if sheet_name in data2)
+    total_common_sheets = len(common_sheets)
+    for sheet_idx, sheet_name in enumerate(common_sheets, 1):
+        print(f"  Comparing sheet {sheet_idx}/{total_common_sheets}: '{sheet_name}'")
+        sheet_data1 = SheetData.from_cells(data1.get(sheet_name, {}))
+        sheet_data2 = SheetData.from_cells(data2.get(sheet_name, {}))
+        for cell_coord, diff_entry in _iter_sheet_diffs(sheet_data1, sheet_data2):
+            yield sheet_name, cell_coord, diff_entry
 
 def compare_excel_data(data1, data2):
     if data1 is None or data2 is None:
@@ -121,12 +607,12 @@ def compare_excel_data(data1, data2):
         return {"_metadata": {"error": "Input data missing"}}
 
     differences = {}
-    sheets1 = set(data1.keys())
-    sheets2 = set(data2.keys())
-
-    sheets_only_in_file1 = list(sheets1 - sheets2)
-    sheets_only_in_file2 = list(sheets2 - sheets1)
-    common_sheets = list(sheets1 & sheets2)
+    # One walk over each file's sheet names; membership tests hit the dicts directly
+    common_sheets = []
+    sheets_only_in_file1 = []
+    for sheet_name in data1:
+        (common_sheets if sheet_name in data2 else sheets_only_in_file1).append(sheet_name)
+    sheets_only_in_file2 = [sheet_name for sheet_name in data2 if sheet_name not in data1]
 
     meta = {
         "sheets_common": sorted(common_sheets),
@@ -137,33 +623,30 @@ def compare_excel_data(data1, data2):
     if meta["sheets_only_in_file1"] or meta["sheets_only_in_file2"] or common_sheets:
          differences["_metadata"] = meta # Ensure metadata is always present if sheets exist
 
+    if data1 is data2:
+        # Same parsed workbook on both sides (e.g. byte-identical files): nothing can differ
+        print("  Both inputs are the same data; no cell differences to look for.")
+        meta.update(identical=bool(meta["sheets_common"]), differing_cell_count=0)
+        differences["_metadata"] = meta
+        return differences
+
     total_common_sheets = len(common_sheets)
     if total_common_sheets > 0:
         print(f"  Comparing {total_common_sheets} common sheet(s)")
     
-    for sheet_idx, sheet_name in enumerate(sorted(common_sheets), 1):
-        print(f"  Comparing sheet {sheet_idx}/{total_common_sheets}: '{sheet_name}'")
-        sheet_diff = {}
-        sheet_data1 = data1.get(sheet_name, {})
-        sheet_data2 = data2.get(sheet_name, {})
-        all_cells = set(sheet_data1.keys()) | set(sheet_data2.keys())
-
-        for cell_coord in sorted(list(all_cells)):
-            default_cell = {"value": "[missing]", "formula": ""}
-            cell_info1 = sheet_data1.get(cell_coord, default_cell)
-            cell_info2 = sheet_data2.get(cell_coord, default_cell)
-
-            values_differ = str(cell_info1["value"]) != str(cell_info2["value"])
-            formulas_differ = cell_info1["formula"] != cell_info2["formula"]
-
-            if values_differ or formulas_differ:
-                sheet_diff[cell_coord] = {
-                    "file1": sheet_data1.get(cell_coord, default_cell),
-                    "file2": sheet_data2.get(cell_coord, default_cell)
-                }
-
-        if sheet_diff:
-            differences[sheet_name] = sheet_diff
+    differing_cell_count = 0
+    for sheet_name, cell_coord, diff_entry in iter_excel_differences(data1, data2):
+        sheet_diff = differences.get(sheet_name)
+        if sheet_diff is None:
+            sheet_diff = differences[sheet_name] = {}
+        sheet_diff[cell_coord] = diff_entry
+        differing_cell_count += 1
+
+    # Recorded here so callers and the summary writer need not re-scan the result.
+    # As before, two workbooks without a single common sheet are never reported identical.
+    meta["identical"] = bool(meta["sheets_common"]) and not (
+        differing_cell_count or meta["sheets_only_in_file1"] or meta["sheets_only_in_file2"])
+    meta["differing_cell_count"] = differing_cell_count
 
     # Ensure metadata is included even if no cell differences found in common sheets
     # (This was implicitly handled before, but making it explicit)
@@ -173,20 +656,21 @@ def compare_excel_data(data1, data2):
     return differences
 
 
-# --- Demo File Creation (Unchanged) ---
+# --- Demo File Creation ---
 
 def create_demo_excel_file(filepath, file_data):
     wb = None
     try:
-        wb = Workbook()
-        if "Sheet" in wb.sheetnames:
-            wb.remove(wb["Sheet"])
+        # Write-only workbooks stream each sheet's rows to the .xlsx as they are appended
+        # instead of building a cell object per coordinate and serialising it all on save
+        wb = Workbook(write_only=True)
 
         for sheet_name, sheet_contents in file_data.items():
             ws = wb.create_sheet(title=sheet_name)
             if not sheet_contents:
                  print(f"  Creating empty sheet '{sheet_name}' in '{filepath}'")
                  continue
+            rows = {} # row_idx -> {col_idx: value_to_write}
             for cell_coord, content in sheet_contents.items():
                 value_to_write = content
                 if isinstance(content, dict):
@@ -198,7 +682,20 @@ def create_demo_excel_file(filepath, file_data):
                           value_to_write = None
                 elif content == '[empty]':
                      value_to_write = None
-                ws[cell_coord] = value_to_write
+                row_idx, col_idx = coordinate_to_tuple(cell_coord)
+                rows.setdefault(row_idx, {})[col_idx] = value_to_write
+
+            # Write-only sheets are filled strictly row by row, top to bottom, one
+            # dense row list per append
+            for row_idx in range(1, max(rows) + 1):
+                row_cells = rows.get(row_idx)
+                if not row_cells:
+                    ws.append(())
+                    continue
+                row_values = [None] * max(row_cells)
+                for col_idx, value_to_write in row_cells.items():
+                    row_values[col_idx - 1] = value_to_write
+                ws.append(row_values)
 
         wb.save(filepath)
         print(f"Successfully created demo file: '{filepath}'")
@@ -211,15 +708,52 @@ def create_demo_excel_file(filepath, file_data):
             wb.close()
 
 
-# --- Text File Output Functions (Unchanged) ---
+# --- Text File Output Functions ---
+
+_REPORT_BUFFER_SIZE = 1 << 20 # Large reports reach the OS in 1 MiB writes instead of 8 KiB ones
+
+def _report_sort_key(cell_coord):
+    # (row number, column letters), the order the reports have always listed cells in;
+    # rstrip/slice/int run in C instead of two filter() passes per coordinate
+    column_letters = cell_coord.rstrip("0123456789")
+    return int(cell_coord[len(column_letters):]), column_letters
+
+def _in_report_order(cells):
+    # SheetData already iterates in (row, column) order, which is the report order as
+    # long as every column letter is a single character
+    return isinstance(cells, SheetData) and max(map(_COL_MASK.__and__, cells.cell_keys), default=0) <= 26
+
+def _sorted_report_items(cells):
+    if _in_report_order(cells):
+        return cells.items()
+    return [(cell_coord, cells[cell_coord]) for cell_coord in sorted(cells, key=_report_sort_key)]
+
+def _sorted_report_cells(cells):
+    # (coordinate, value, formula) triples; SheetData's columns are zipped as they are,
+    # without building a {"value", "formula"} dict per cell
+    if _in_report_order(cells):
+        return zip(cells, cells.cell_values, cells.cell_formulas)
+    return [(cell_coord, cell_info.get('value', '[error retrieving value]'), cell_info.get('formula', ''))
+            for cell_coord, cell_info in _sorted_report_items(cells)]
+
+def _ensure_output_dir(output_filepath):
+    output_dir = os.path.dirname(output_filepath)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
 
-def write_excel_data_to_txt(source_filepath, excel_data, output_filepath):
+def _report_timestamp():
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S %Z')
+
+# The report writers create a missing output directory; compare_excel_files_e2e has
+# already made its directory once per run and passes ensure_dir=False to skip that.
+# report_timestamp lets one run stamp all of its reports with the same time
+def write_excel_data_to_txt(source_filepath, excel_data, output_filepath, ensure_dir=True, report_timestamp=None):
     print(f"  Writing content dump to '{output_filepath}'...")
     try:
-        os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        with open(output_filepath, 'w', encoding='utf-8') as f:
+        if ensure_dir: _ensure_output_dir(output_filepath)
+        with open(output_filepath, 'w', encoding='utf-8', buffering=_REPORT_BUFFER_SIZE) as f:
             f.write(f"Content Dump for Excel File: {source_filepath}\n")
-            f.write(f"Generated on (UTC): {datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S %Z')}\n")
+            f.write(f"Generated on (UTC): {report_timestamp or _report_timestamp()}\n")
             f.write("=" * 40 + "\n\n")
             if not excel_data:
                 f.write("No sheets or data found in the file.\n")
@@ -233,28 +767,31 @@ def write_excel_data_to_txt(source_filepath, excel_data, output_filepath):
                     f.write("  [Sheet is empty or contains no tracked data]\n\n")
                     continue
                 # Sort cells based on row number, then column letter
-                sorted_cells = sorted(sheet_content.keys(), key=lambda x: (int(''.join(filter(str.isdigit, x))), ''.join(filter(str.isalpha, x))))
-                for cell_coord in sorted_cells:
-                    cell_info = sheet_content[cell_coord]
-                    value_str = cell_info.get('value', '[error retrieving value]')
-                    formula_str = cell_info.get('formula', '')
-                    f.write(f"  {cell_coord:<8}: Value = {value_str}")
-                    if formula_str: f.write(f", Formula = {formula_str}")
-                    f.write("\n")
-                f.write("\n")
+                sorted_cells = _sorted_report_cells(sheet_content)
+                # Collect the sheet's lines and hand them to the file in one write
+                parts = []
+                for cell_coord, value_str, formula_str in sorted_cells:
+                    # One formatted line (and one append) per cell
+                    if formula_str:
+                        parts.append(f"  {cell_coord:<8}: Value = {value_str}, Formula = {formula_str}\n")
+                    else:
+                        parts.append(f"  {cell_coord:<8}: Value = {value_str}\n")
+                parts.append("\n")
+                f.write("".join(parts))
         print(f"  Successfully wrote content dump to '{output_filepath}'")
         return True # Indicate success
     except Exception as e:
         print(f"Error writing content dump to '{output_filepath}': {e}")
         return False # Indicate failure
 
-def write_comparison_summary_to_txt(file1_path, file2_path, comparison_results, output_filepath):
+def write_comparison_summary_to_txt(file1_path, file2_path, comparison_results, output_filepath, ensure_dir=True,
+                                    report_timestamp=None):
     print(f"  Writing comparison summary to '{output_filepath}'...")
     try:
-        os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        with open(output_filepath, 'w', encoding='utf-8') as f:
+        if ensure_dir: _ensure_output_dir(output_filepath)
+        with open(output_filepath, 'w', encoding='utf-8', buffering=_REPORT_BUFFER_SIZE) as f:
             f.write("Excel File Comparison Summary\n")
-            f.write(f"Generated on (UTC): {datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S %Z')}\n")
+            f.write(f"Generated on (UTC): {report_timestamp or _report_timestamp()}\n")
             f.write(f"File 1: {file1_path}\n")
             f.write(f"File 2: {file2_path}\n")
             f.write("=" * 40 + "\n\n")
@@ -267,9 +804,12 @@ def write_comparison_summary_to_txt(file1_path, file2_path, comparison_results,
                  return False
 
             meta = comparison_results.get("_metadata")
-            # Check if the only content is metadata indicating identical files
+            # compare_excel_data records the verdict; results without it (built elsewhere)
+            # are checked for being metadata only, indicating identical files
             is_identical = False
-            if meta and len(comparison_results) == 1: # Only metadata key exists
+            if meta and "identical" in meta:
+                 is_identical = meta["identical"]
+            elif meta and len(comparison_results) == 1: # Only metadata key exists
                  if not meta.get("sheets_only_in_file1") and not meta.get("sheets_only_in_file2"):
                       # Check if there are common sheets listed, implying comparison happened
                       if meta.get("sheets_common"):
@@ -330,24 +870,25 @@ def write_comparison_summary_to_txt(file1_path, file2_path, comparison_results,
 
                     f.write(f"\n--- Differences in Sheet: {sheet_name} ---\n")
                     # Sort differing cells based on row number, then column letter
-                    sorted_cells = sorted(sheet_diff_data.keys(), key=lambda x: (int(''.join(filter(str.isdigit, x))), ''.join(filter(str.isalpha, x))))
-                    f.write(f"  Found {len(sorted_cells)} cell(s) with differences\n")
-                    for cell_coord in sorted_cells:
-                        diff_info = sheet_diff_data[cell_coord]
+                    sorted_cells = _sorted_report_items(sheet_diff_data)
+                    # Collect the sheet's lines and hand them to the file in one write
+                    parts = [f"  Found {len(sorted_cells)} cell(s) with differences\n"]
+                    for cell_coord, diff_info in sorted_cells:
                         # Check if diff_info is the expected format
                         if not isinstance(diff_info, dict) or 'file1' not in diff_info or 'file2' not in diff_info:
-                             f.write(f"  Cell: {cell_coord} - Error: Malformed difference information.\n\n")
+                             parts.append(f"  Cell: {cell_coord} - Error: Malformed difference information.\n\n")
                              continue
 
                         info1 = diff_info.get('file1', {'value': '[error]', 'formula': ''})
                         info2 = diff_info.get('file2', {'value': '[error]', 'formula': ''})
-                        f.write(f"  Cell: {cell_coord}\n")
-                        f.write(f"    File 1: Value = {info1.get('value','[N/A]')}")
-                        if info1.get('formula'): f.write(f", Formula = {info1['formula']}")
-                        f.write("\n")
-                        f.write(f"    File 2: Value = {info2.get('value','[N/A]')}")
-                        if info2.get('formula'): f.write(f", Formula = {info2['formula']}")
-                        f.write("\n\n")
+                        parts.append(f"  Cell: {cell_coord}\n")
+                        parts.append(f"    File 1: Value = {info1.get('value','[N/A]')}")
+                        if info1.get('formula'): parts.append(f", Formula = {info1['formula']}")
+                        parts.append("\n")
+                        parts.append(f"    File 2: Value = {info2.get('value','[N/A]')}")
+                        if info2.get('formula'): parts.append(f", Formula = {info2['formula']}")
+                        parts.append("\n\n")
+                    f.write("".join(parts))
         print(f"  Successfully wrote comparison summary to '{output_filepath}'")
         return True # Indicate success
     except Exception as e:
@@ -355,9 +896,63 @@ def write_comparison_summary_to_txt(file1_path, file2_path, comparison_results,
         return False # Indicate failure
 
 
+def write_differences_to_jsonl(differences, output_filepath):
+    """
+    Streams (sheet_name, cell_coord, diff_entry) records, e.g. from
+    iter_excel_differences(), to output_filepath as JSON Lines: one
+    {"sheet", "cell", "file1", "file2"} object per line, written as each record
+    arrives. Returns the number of records written, or None on error.
+    """
+    print(f"  Streaming cell differences to '{output_filepath}'...")
+    try:
+        _ensure_output_dir(output_filepath)
+        record_count = 0
+        with open(output_filepath, 'w', encoding='utf-8', buffering=_REPORT_BUFFER_SIZE) as f:
+            for sheet_name, cell_coord, diff_entry in differences:
+                record = {"sheet": sheet_name, "cell": cell_coord,
+                          "file1": diff_entry["file1"], "file2": diff_entry["file2"]}
+                f.write(_JSON_ENCODER.encode(record) + "\n")
+                record_count += 1
+        print(f"  Wrote {record_count} cell difference(s) to '{output_filepath}'")
+        return record_count
+    except Exception as e:
+        print(f"Error writing cell differences to '{output_filepath}': {e}")
+        return None
+
+def write_comparison_to_json(comparison_results, output_filepath):
+    """
+    Writes a compare_excel_data() result to output_filepath as one compact UTF-8 JSON
+    document, for consumers that want the differences in machine-readable form rather
+    than the text summary. Returns True on success, False on error.
+    """
+    print(f"  Writing comparison JSON to '{output_filepath}'...")
+    try:
+        _ensure_output_dir(output_filepath)
+        with open(output_filepath, 'wb') as f:
+            f.write(_JSON_ENCODER.encode(comparison_results).encode("utf-8"))
+        print(f"  Successfully wrote comparison JSON to '{output_filepath}'")
+        return True
+    except Exception as e:
+        print(f"Error writing comparison JSON to '{output_filepath}': {e}")
+        return False
+
 # --- NEW: End-to-End Comparison Function ---
 
-def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
+_REPORT_TIMEZONE = 'Asia/Jakarta' # Output directories are timestamped in Jakarta time
+
+@functools.lru_cache(maxsize=None)
+def _report_timezone():
+    # Resolved once per process. zoneinfo needs a system tz database (or the tzdata
+    # package); pytz, which bundles its own, covers the cases where it is missing
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(_REPORT_TIMEZONE)
+        except Exception:
+            pass
+    import pytz
+    return pytz.timezone(_REPORT_TIMEZONE)
+
+def compare_excel_files_e2e(file1_path, file2_path, keep_files=True, use_cache=False, json_report=False):
     """
     Performs the end-to-end comparison of two Excel files.
 
@@ -371,6 +966,12 @@ def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
         keep_files (bool, optional): If True, generated text reports and the
                                      output directory are not deleted.
                                      Defaults to False (cleanup occurs).
+        use_cache (bool, optional): If True, parsed workbook data is cached under
+                                    '.cache/' keyed by file contents and reused for
+                                    unchanged workbooks. Defaults to False.
+        json_report (bool, optional): If True, the comparison results are also
+                                      written as compact JSON next to the text
+                                      summary. Defaults to False.
 
     Returns:
         dict or None: The comparison results dictionary, or None if a critical
@@ -390,17 +991,20 @@ def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
     file1_txt_dump_base = f"{f1_basename}_contents.txt"
     file2_txt_dump_base = f"{f2_basename}_contents.txt"
     comparison_summary_txt_base = f"comparison_{f1_basename}_vs_{f2_basename}.txt"
+    comparison_json_base = f"comparison_{f1_basename}_vs_{f2_basename}.json"
 
     # --- Create Timestamped Output Directory ---
     output_dir_name = "." # Default to current dir if error occurs
     file1_txt_dump_path = file1_txt_dump_base
     file2_txt_dump_path = file2_txt_dump_base
     comparison_summary_txt_path = comparison_summary_txt_base
+    comparison_json_path = comparison_json_base
     output_directory_created = False
+    # One clock read names the output directory and stamps all three reports
+    now_utc = datetime.datetime.now(datetime.timezone.utc)
+    report_timestamp = now_utc.strftime('%Y-%m-%d %H:%M:%S %Z')
     try:
-        jakarta_tz = pytz.timezone('Asia/Jakarta')
-        now_utc = datetime.datetime.now(pytz.utc)
-        now_jakarta = now_utc.astimezone(jakarta_tz)
+        now_jakarta = now_utc.astimezone(_report_timezone())
         timestamp_str = now_jakarta.strftime('%Y%m%d_%H%M%S')
         # Make directory name slightly more descriptive
         output_dir_name = f"comparison_output_{timestamp_str}"
@@ -411,9 +1015,10 @@ def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
         file1_txt_dump_path = os.path.join(output_dir_name, file1_txt_dump_base)
         file2_txt_dump_path = os.path.join(output_dir_name, file2_txt_dump_base)
         comparison_summary_txt_path = os.path.join(output_dir_name, comparison_summary_txt_base)
+        comparison_json_path = os.path.join(output_dir_name, comparison_json_base)
 
-    except pytz.UnknownTimeZoneError:
-         print("Error: Timezone 'Asia/Jakarta' not found. Check pytz installation.")
+    except KeyError: # ZoneInfoNotFoundError / pytz.UnknownTimeZoneError
+         print("Error: Timezone 'Asia/Jakarta' not found. Install the 'tzdata' or 'pytz' package.")
          print("Text report outputs will be saved in the current directory instead.")
          output_dir_name = "."
     except Exception as e:
@@ -423,10 +1028,30 @@ def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
 
     # --- Read Data from Files ---
     print(f"\n--- Reading Data (Stage 1/4) ---")
-    print(f"  Reading file 1: {file1_path}")
-    excel1_contents = read_excel_file_data(file1_path)
-    print(f"  Reading file 2: {file2_path}")
-    excel2_contents = read_excel_file_data(file2_path)
+    # Hashing is far cheaper than parsing; byte-identical inputs are parsed once and
+    # the cell comparison is skipped (the reports come out exactly as before). Files of
+    # different sizes cannot be identical and are only hashed when the cache needs the
+    # digests; either way each file is hashed at most once
+    file1_digest = file2_digest = None
+    try:
+        same_size = os.path.getsize(file1_path) == os.path.getsize(file2_path)
+        if same_size or use_cache:
+            file1_digest = _file_digest(file1_path)
+            file2_digest = _file_digest(file2_path)
+        files_identical = same_size and file1_digest == file2_digest
+    except OSError:
+        file1_digest = file2_digest = None
+        files_identical = False # Let the reader report missing/unreadable files
+    if files_identical:
+        print(f"  Reading file 1: {file1_path}")
+        excel1_contents = read_excel_file_data(file1_path, use_cache=use_cache, content_digest=file1_digest)
+        print(f"  File 2 is byte-identical to file 1 (same SHA-256); reusing its data: {file2_path}")
+        excel2_contents = excel1_contents
+    else:
+        # One header for both: in worker processes the two files' progress interleaves
+        print(f"  Reading files 1 and 2: {file1_path}, {file2_path}")
+        excel1_contents, excel2_contents = _read_excel_files_data([file1_path, file2_path], use_cache=use_cache,
+                                                                  content_digests=[file1_digest, file2_digest])
 
     # Handle cases where reading failed critically
     if excel1_contents is None or excel2_contents is None:
@@ -436,16 +1061,25 @@ def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
 
     # --- Write Individual Content Dumps ---
     print("\n--- Writing Content Dumps (Stage 2/4) ---")
-    write_excel_data_to_txt(file1_path, excel1_contents, file1_txt_dump_path)
-    write_excel_data_to_txt(file2_path, excel2_contents, file2_txt_dump_path)
+    write_excel_data_to_txt(file1_path, excel1_contents, file1_txt_dump_path, ensure_dir=False,
+                            report_timestamp=report_timestamp)
+    write_excel_data_to_txt(file2_path, excel2_contents, file2_txt_dump_path, ensure_dir=False,
+                            report_timestamp=report_timestamp)
 
     # --- Compare the Data ---
     print("\n--- Comparing Files (Stage 3/4) ---")
+    # Byte-identical files share one parsed object, which compare_excel_data answers
+    # (identical included) without looking at any cell
     comparison_results = compare_excel_data(excel1_contents, excel2_contents)
+    if files_identical and "_metadata" in comparison_results:
+        comparison_results["_metadata"]["sha256"] = file1_digest.hex()
 
     # --- Write Comparison Summary Report ---
     print("\n--- Writing Comparison Summary (Stage 4/4) ---")
-    write_comparison_summary_to_txt(file1_path, file2_path, comparison_results, comparison_summary_txt_path)
+    write_comparison_summary_to_txt(file1_path, file2_path, comparison_results, comparison_summary_txt_path,
+                                    ensure_dir=False, report_timestamp=report_timestamp)
+    if json_report:
+        write_comparison_to_json(comparison_results, comparison_json_path)
 
     # --- Cleanup Generated Output Files (Conditional) ---
     # Note: This function only cleans up the files IT generated (reports).
@@ -457,6 +1091,8 @@ def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
             file2_txt_dump_path,
             comparison_summary_txt_path
         ]
+        if json_report:
+            files_to_clean.append(comparison_json_path)
         for f_path in files_to_clean:
             try:
                 if os.path.exists(f_path) and os.path.isfile(f_path): # Check it's a file
@@ -485,6 +1121,11 @@ def compare_excel_files_e2e(file1_path, file2_path, keep_files=True):
 
 # --- Main Execution & Demonstration ---
 
+# Beyond this many differing cells, printing the results dictionary to a terminal
+# costs more than the whole comparison; main() prints a pointer to the report instead
+# (output redirected to a file or pipe is always printed in full)
+_PRINT_RESULTS_MAX_CELLS = 10000
+
 def main():
     # --- Argument Parsing ---
     parser = argparse.ArgumentParser(
@@ -506,6 +1147,33 @@ def main():
         action="store_true",
         help="If set, prevents the deletion of generated demo Excel files (if created)\nand all generated text report files/directory."
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Cache parsed workbooks under '.cache/' in the current directory, keyed by\nfile path and contents, and reuse them on later runs. Entries are loaded with\npickle, so only use this where nobody else can write to that directory."
+    )
+    parser.add_argument(
+        "--diff-jsonl",
+        type=str,
+        metavar="OUTPUT_FILE",
+        help="Stream the cell differences to OUTPUT_FILE as JSON Lines (one difference\nper line) instead of writing the text reports and printing the results dictionary."
+    )
+    parser.add_argument(
+        "--json-report",
+        action="store_true",
+        help="Also write the comparison results as compact JSON\n(comparison_<file1>_vs_<file2>.json) next to the text summary."
+    )
+    parser.add_argument(
+        "--print-json",
+        choices=("pretty", "compact", "none"),
+        default="pretty",
+        help="How to print the results dictionary at the end: indented (default), compact\n(one line, several times faster to produce) or not at all."
+    )
+    parser.add_argument(
+        "--print-all-results",
+        action="store_true",
+        help=f"Print the results dictionary to a terminal even when it lists more than\n{_PRINT_RESULTS_MAX_CELLS} differing cells (the comparison summary report always lists them all)."
+    )
     args = parser.parse_args()
 
     print("="*50)
@@ -513,6 +1181,7 @@ def main():
     print("="*50)
     if args.keep_files:
         print(" [--keep-files flag set: Generated files will NOT be deleted.]")
+    use_cache = args.cache
 
 
     # --- Determine Input Files (Use demo or provided) ---
@@ -589,22 +1258,48 @@ def main():
              exit(1)
 
 
-    # --- Call the End-to-End Comparison Function ---
-    # Pass the determined input file paths and the keep_files flag
-    results = compare_excel_files_e2e(input_file1, input_file2, keep_files=args.keep_files)
-
-    # Optional: Print the returned results dictionary from the E2E function
-    if results is not None:
-         print("\n--- Comparison Results (Dictionary returned by E2E function) ---")
-         # Use json.dumps for pretty printing the potentially large dictionary
-         # Limit depth or handle large output appropriately if needed for console
-         try:
-             print(json.dumps(results, indent=2))
-         except TypeError as e:
-             print(f"Could not serialize results dictionary to JSON: {e}")
-             print(results) # Print raw dictionary as fallback
+    if args.diff_jsonl:
+        # --- Stream Differences Without Building the Results Dictionary ---
+        print("\n--- Streaming Cell Differences to JSON Lines ---")
+        excel1_contents, excel2_contents = _read_excel_files_data([input_file1, input_file2],
+                                                                  use_cache=use_cache)
+        if excel1_contents is None or excel2_contents is None:
+            print("Error: Failed to read one or both Excel files. Comparison cannot proceed.")
+        else:
+            write_differences_to_jsonl(iter_excel_differences(excel1_contents, excel2_contents), args.diff_jsonl)
     else:
-         print("\nEnd-to-end comparison function did not return results (critical error occurred).")
+        # --- Call the End-to-End Comparison Function ---
+        # Pass the determined input file paths and the keep_files flag
+        results = compare_excel_files_e2e(input_file1, input_file2, keep_files=args.keep_files,
+                                          use_cache=use_cache, json_report=args.json_report)
+
+        # Optional: Print the returned results dictionary from the E2E function
+        diff_cell_count = 0
+        if results is not None:
+             diff_cell_count = results.get("_metadata", {}).get("differing_cell_count", 0)
+        if results is not None and args.print_json == "none":
+             print(f"\n--- Comparison Results: {diff_cell_count} differing cell(s) (not printed, --print-json none) ---")
+        elif (results is not None and diff_cell_count > _PRINT_RESULTS_MAX_CELLS and not args.print_all_results
+                and sys.stdout.isatty()):
+             print(f"\n--- Comparison Results: {diff_cell_count} differing cell(s) ---")
+             print(f"  Too many to print (over {_PRINT_RESULTS_MAX_CELLS}). Re-run with --keep-files to keep the")
+             print("  comparison summary report, --diff-jsonl OUTPUT_FILE, or --print-all-results.")
+        elif results is not None:
+             print("\n--- Comparison Results (Dictionary returned by E2E function) ---")
+             # default=str renders the datetime values openpyxl returns instead of aborting
+             # the dump. Pretty output is streamed by json.dump rather than built as one
+             # string; compact output is one json.dumps call, which runs on the C encoder
+             try:
+                 if args.print_json == "compact":
+                     sys.stdout.write(json.dumps(results, separators=(",", ":"), default=str))
+                 else:
+                     json.dump(results, sys.stdout, indent=2, default=str)
+                 print()
+             except (TypeError, ValueError) as e:
+                 print(f"Could not serialize results dictionary to JSON: {e}")
+                 print(results) # Print raw dictionary as fallback
+        else:
+             print("\nEnd-to-end comparison function did not return results (critical error occurred).")
 
 
     # --- Cleanup Demo Excel Files (if they were created and not keeping files) ---
@@ -613,16 +1308,25 @@ def main():
         # Only clean up the specific demo files created by this run
         if demo_file1_created and os.path.exists(input_file1):
             try:
+                # Hashing the file for its cache entry is only worth it if one was written
+                demo_cache_path = _cache_path(input_file1) if use_cache else None
                 os.remove(input_file1)
                 print(f"Removed demo file: '{input_file1}'")
+                if demo_cache_path and os.path.exists(demo_cache_path):
+                    os.remove(demo_cache_path)
             except Exception as e:
                 print(f"Error cleaning up demo file '{input_file1}': {e}")
         if demo_file2_created and os.path.exists(input_file2):
             try:
+                demo_cache_path = _cache_path(input_file2) if use_cache else None
                 os.remove(input_file2)
                 print(f"Removed demo file: '{input_file2}'")
+                if demo_cache_path and os.path.exists(demo_cache_path):
+                    os.remove(demo_cache_path)
             except Exception as e:
                 print(f"Error cleaning up demo file '{input_file2}': {e}")
+        if use_cache and os.path.isdir(_CACHE_DIR) and not os.listdir(_CACHE_DIR):
+            os.rmdir(_CACHE_DIR) # Only held the demo files' entries
 
 
     print("\nUtility finished.")
@@ -636,11 +1340,5 @@ if __name__ == "__main__":
         print("Error: The 'openpyxl' library is required but not installed.")
         print("Please install it using: pip install openpyxl")
         exit(1)
-    try:
-        import pytz
-    except ImportError:
-        print("Error: The 'pytz' library is required but not installed.")
-        print("Please install it using: pip install pytz")
-        exit(1)
 
     main()
\ No newline at end of file
@@ -2,6 +2,7 @@
 from .excel_handler_o1pro import (
     read_excel_to_dict,
     compare_excel_dicts,
+    iter_excel_dict_differences,
     export_excel_dict_to_txt,
     export_comparison_to_txt,
     create_dummy_excel_files,
@@ -12,6 +13,7 @@ from .excel_handler_o1pro import (
 __all__ = [
     'read_excel_to_dict',
     'compare_excel_dicts',
+    'iter_excel_dict_differences',
     'export_excel_dict_to_txt',
     'export_comparison_to_txt',
     'create_dummy_excel_files',
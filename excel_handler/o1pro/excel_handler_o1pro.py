@@ -28,13 +28,91 @@ All functionalities are kept in a single script, with dedicated functions to
 achieve the tasks.
 """
 
-import openpyxl
+from openpyxl.utils import get_column_letter, coordinate_to_tuple
 import os
 import datetime
-import pytz
+import zipfile
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+from excel_handler._xlsx_reader import (
+    iter_sheet_cells,
+    new_string_pool,
+    read_date_styles,
+    read_shared_strings,
+    read_workbook_layout,
+)
 
-def read_excel_to_dict(file_path):
+
+class SheetData(Mapping):
+    """
+    The cells of one sheet, as returned per sheet by read_excel_to_dict().
+
+    Rather than one {"value": ..., "formula": ...} dict per cell, the cells
+    are kept as three parallel lists, in the order they were appended
+    (row-major order for the sheets read_excel_to_dict() returns):
+      - coords:   the cell coordinates, e.g. "A1"
+      - values:   the computed (cached) values
+      - formulas: the formulas, or "" for cells without one
+
+    It still behaves as the read-only {"A1": {"value": ..., "formula": ...}}
+    mapping described in read_excel_to_dict(); the per-cell dict is only
+    built when a cell is looked up, and the coordinate -> position index the
+    first time any cell is looked up.
+    """
+
+    def __init__(self):
+        self.coords = []
+        self.values = []
+        self.formulas = []
+        self._positions = None
+
+    def append(self, coord, value, formula):
+        self.coords.append(coord)
+        self.values.append(value)
+        self.formulas.append(formula)
+        self._positions = None
+
+    def positions(self):
+        """Return (and cache) a {coord: position} dict for this sheet."""
+        if self._positions is None:
+            self._positions = {coord: idx for idx, coord in enumerate(self.coords)}
+        return self._positions
+
+    def __getitem__(self, cell_coord):
+        idx = self.positions()[cell_coord]
+        return {"value": self.values[idx], "formula": self.formulas[idx]}
+
+    def __contains__(self, cell_coord):
+        return cell_coord in self.positions()
+
+    def __iter__(self):
+        return iter(self.coords)
+
+    def __len__(self):
+        return len(self.coords)
+
+
+def _in_row_major_order(sheet_data):
+    """
+    Return a copy of sheet_data with its cells sorted by (row, column).
+
+    Only needed for sheet XML that lists rows or cells out of order; a cell
+    listed more than once keeps the last value and formula given for it.
+    """
+    latest = {}
+    for idx, coord in enumerate(sheet_data.coords):
+        latest[coordinate_to_tuple(coord)] = idx
+
+    ordered = SheetData()
+    for key in sorted(latest):
+        idx = latest[key]
+        ordered.append(sheet_data.coords[idx], sheet_data.values[idx], sheet_data.formulas[idx])
+    return ordered
+
+
+def read_excel_to_dict(file_path, sheet_names=None):
     """
     Read an Excel file and return a nested dictionary of:
         {
@@ -46,48 +124,230 @@ def read_excel_to_dict(file_path):
             ...
         }
 
-    We use two workbooks:
-      - data_only=False: to extract the actual formulas.
-      - data_only=True:  to extract the last computed (cached) values.
+    For every cell we want both the formula (if any) and its last computed
+    (cached) value. An .xlsx file stores the two side by side in each <c>
+    element of the sheet XML (<f> and <v>), so instead of loading the
+    workbook twice with openpyxl (data_only=False for the formulas,
+    data_only=True for the values) the .xlsx archive is opened once and each
+    sheet's XML is streamed a single time by excel_handler._xlsx_reader (the
+    reader the gemini handler uses too), taking both from every cell. Values
+    and formulas come out as openpyxl would report them. The shared-strings
+    table, styles and date settings are read once for the whole workbook.
+
+    Only cells that hold a value or a formula are listed, in row-major order.
+    Empty cells, including blank cells some producers write out just for
+    their formatting, are left out rather than padded in: a cell that is not
+    listed has value None and no formula, which is also how
+    compare_excel_dicts() treats a cell that only one sheet lists.
+
+    Each sheet's mapping is a SheetData, which stores the cells as parallel
+    coordinate/value/formula lists instead of one small dict per cell.
+
+    sheet_names (optional) limits the result to the listed sheets; the XML of
+    every other sheet is then never decompressed or parsed, which saves most
+    of the work when only a few sheets of a large workbook are of interest.
+    Sheets still come out in workbook order, and a name that is not in the
+    workbook raises a KeyError.
+    """
+    excel_dict = {}
+
+    with zipfile.ZipFile(file_path) as archive:
+        sheets, parts, epoch = read_workbook_layout(archive)
+        shared_strings = read_shared_strings(archive, parts.get("sharedStrings"))
+        date_formats, timedelta_formats = read_date_styles(archive, parts.get("styles"))
+        # One str object per distinct formula / text result in the workbook, the
+        # way shared strings already are; copy-filled formulas repeat a lot.
+        string_pool = new_string_pool(shared_strings)
+
+        if sheet_names is not None:
+            requested = set(sheet_names)
+            missing = requested.difference(name for name, _ in sheets)
+            if missing:
+                raise KeyError(f"Worksheet(s) {', '.join(sorted(missing))} not found in {file_path}")
+            sheets = [(name, part) for name, part in sheets if name in requested]
+
+        for sheet_name, sheet_part in sheets:
+            cells = iter_sheet_cells(archive, sheet_part, shared_strings, date_formats,
+                                     timedelta_formats, epoch, string_pool)
+
+            # The cells go straight into the SheetData's columns as they are
+            # streamed; sheet XML lists its rows and cells in order, so there
+            # is nothing to sort unless that turns out not to hold.
+            sheet_data = SheetData()
+            append_coord = sheet_data.coords.append
+            append_value = sheet_data.values.append
+            append_formula = sheet_data.formulas.append
+            col_letters = {}
+            in_order = True
+            last_row_idx = last_col_idx = 0
+            row_str = ""
+            for row_idx, col_idx, computed_value, formula in cells:
+                if computed_value is None and formula == "":
+                    # An empty cell (e.g. one written out only for its
+                    # style); it reads the same as a missing one.
+                    continue
+
+                if row_idx != last_row_idx:
+                    if row_idx < last_row_idx:
+                        in_order = False
+                    row_str = str(row_idx)
+                elif col_idx <= last_col_idx:
+                    in_order = False
+                last_row_idx, last_col_idx = row_idx, col_idx
+
+                col_letter = col_letters.get(col_idx)
+                if col_letter is None:
+                    col_letter = col_letters[col_idx] = get_column_letter(col_idx)
+                append_coord(col_letter + row_str)
+                append_value(computed_value)
+                append_formula(formula)
+
+            if not in_order:
+                sheet_data = _in_row_major_order(sheet_data)
+            excel_dict[sheet_name] = sheet_data
 
-    Then we combine them to get both the cell's formula (if any) and
-    its last computed value.
+    return excel_dict
+
+
+# Reading files in separate processes only pays off once they are big enough to
+# outweigh starting the workers and pickling the parsed sheets back.
+_PARALLEL_MIN_FILE_BYTES = 4 * 1024 * 1024
+
+
+def _read_excel_files_to_dicts(file_paths):
+    """
+    Read several Excel files with read_excel_to_dict(), returning their
+    dictionaries in the same order as file_paths.
+
+    The files are independent of each other and parsing them is CPU-bound
+    (unzipping plus XML parsing, which holds the GIL), so large files are
+    read at the same time in worker processes, one per file. Small files,
+    single-CPU machines, or EXCEL_HANDLER_PARALLEL_IO=0 (the same switch the
+    gemini implementation uses) read them one after another; so does any
+    platform where worker processes cannot be started.
     """
-    wb_formulas = openpyxl.load_workbook(file_path, data_only=False)
-    wb_values = openpyxl.load_workbook(file_path, data_only=True)
+    try:
+        read_in_parallel = (len(file_paths) > 1 and (os.cpu_count() or 1) >= 2 and
+                            os.environ.get("EXCEL_HANDLER_PARALLEL_IO", "1") != "0" and
+                            sum(os.path.getsize(path) for path in file_paths) >= _PARALLEL_MIN_FILE_BYTES)
+    except OSError:
+        # A missing file is reported by read_excel_to_dict() itself
+        read_in_parallel = False
+
+    if read_in_parallel:
+        try:
+            with ProcessPoolExecutor(max_workers=len(file_paths)) as executor:
+                return list(executor.map(read_excel_to_dict, file_paths))
+        except (OSError, BrokenProcessPool):
+            pass
+    return [read_excel_to_dict(path) for path in file_paths]
+
+
+def _as_sheet_data(sheet_data):
+    """
+    Return one sheet of an Excel dictionary as a SheetData.
 
-    excel_dict = {}
+    A plain {coord: {"value": ..., "formula": ...}} dict (e.g. one built by
+    hand) is converted, with a missing "value" read as None and a missing
+    "formula" as "".
+    """
+    if isinstance(sheet_data, SheetData):
+        return sheet_data
+    converted = SheetData()
+    for cell_coord, cell_info in sheet_data.items():
+        converted.append(cell_coord, cell_info.get("value", None), cell_info.get("formula", ""))
+    return converted
 
-    # We'll iterate over wb_formulas' sheetnames because it definitely has
-    # all the sheets in the file.
-    for sheet_name in wb_formulas.sheetnames:
-        sheet_formula = wb_formulas[sheet_name]
-        sheet_value = wb_values[sheet_name]
 
-        sheet_data = {}
-        for row in sheet_formula.iter_rows():
-            for cell_f in row:
-                cell_v = sheet_value[cell_f.coordinate]
+def iter_excel_dict_differences(dict1, dict2):
+    """
+    Lazily yield the cell-level differences between two Excel dictionaries
+    produced by `read_excel_to_dict`, one (sheet_name, cell_coord, changes)
+    tuple per differing cell, where changes is the same
+    {"value": (val1, val2), "formula": (formula1, formula2)} dict (with only
+    the differing parts) that compare_excel_dicts() stores for the cell.
+
+    Only sheets present in both dictionaries are compared. All differences
+    of one sheet are yielded before those of the next, so they can be
+    written out as they are found instead of being collected first.
+    """
+    # Collect only the intersection of sheet names for cell-level diffs
+    common_sheets = set(dict1.keys()).intersection(dict2.keys())
+
+    for sheet in common_sheets:
+        sheet1 = _as_sheet_data(dict1[sheet])
+        sheet2 = _as_sheet_data(dict2[sheet])
+        coords1, values1, formulas1 = sheet1.coords, sheet1.values, sheet1.formulas
+        coords2, values2, formulas2 = sheet2.coords, sheet2.values, sheet2.formulas
+
+        # Split the cell coordinates into those present in both sheets (as
+        # pairs of positions) and those present in only one of them. When
+        # both sheets list exactly the same coordinates in the same order
+        # (checked by comparing the coordinate lists), the cells pair up
+        # position by position.
+        if coords1 == coords2:
+            # An unchanged sheet (the usual case between two versions of a
+            # workbook) is recognised by comparing the whole value and
+            # formula lists at once, without walking its cells.
+            if values1 == values2 and formulas1 == formulas2:
+                continue
+            common = ((cell_coord, idx, idx) for idx, cell_coord in enumerate(coords1))
+            only_in_1 = only_in_2 = ()
+        else:
+            # Set differences of the coordinate sets; usually small next to
+            # the cells both sheets share.
+            positions1, positions2 = sheet1.positions(), sheet2.positions()
+            only_coords_1 = positions1.keys() - positions2.keys()
+            only_coords_2 = positions2.keys() - positions1.keys()
+            if only_coords_1:
+                shared_coords = [cell_coord for cell_coord in coords1 if cell_coord not in only_coords_1]
+            else:
+                shared_coords = coords1
+            common = zip(shared_coords,
+                         map(positions1.__getitem__, shared_coords),
+                         map(positions2.__getitem__, shared_coords))
+            only_in_1 = sorted(positions1[cell_coord] for cell_coord in only_coords_1)
+            only_in_2 = sorted(positions2[cell_coord] for cell_coord in only_coords_2)
+
+        for cell_coord, idx1, idx2 in common:
+            val1, val2 = values1[idx1], values2[idx2]
+            formula1, formula2 = formulas1[idx1], formulas2[idx2]
 
-                # If the cell is a formula, openpyxl (with data_only=False)
-                # stores that formula in 'cell_f.value' when cell_f.data_type == 'f'.
-                if cell_f.data_type == 'f':
-                    formula = cell_f.value  # e.g., "=SUM(A1,A2)"
-                else:
-                    formula = ""
+            cell_subdiff = {}
+
+            # Check value differences
+            if val1 != val2:
+                cell_subdiff["value"] = (val1, val2)
 
-                # cell_v.value is the computed value (from the data_only=True workbook),
-                # or the literal value if there's no formula.
-                computed_value = cell_v.value
+            # Check formula differences
+            if formula1 != formula2:
+                cell_subdiff["formula"] = (formula1, formula2)
 
-                sheet_data[cell_f.coordinate] = {
-                    "value": computed_value,
-                    "formula": formula
-                }
+            # If anything differs, record it
+            if cell_subdiff:
+                yield sheet, cell_coord, cell_subdiff
 
-        excel_dict[sheet_name] = sheet_data
+        # A cell missing from one sheet counts as an empty cell there (value
+        # None, no formula), so only non-empty cells show up as differences.
+        for idx in only_in_1:
+            val1, formula1 = values1[idx], formulas1[idx]
+            cell_subdiff = {}
+            if val1 is not None:
+                cell_subdiff["value"] = (val1, None)
+            if formula1 != "":
+                cell_subdiff["formula"] = (formula1, "")
+            if cell_subdiff:
+                yield sheet, coords1[idx], cell_subdiff
 
-    return excel_dict
+        for idx in only_in_2:
+            val2, formula2 = values2[idx], formulas2[idx]
+            cell_subdiff = {}
+            if val2 is not None:
+                cell_subdiff["value"] = (None, val2)
+            if formula2 != "":
+                cell_subdiff["formula"] = ("", formula2)
+            if cell_subdiff:
+                yield sheet, coords2[idx], cell_subdiff
 
 
 def compare_excel_dicts(dict1, dict2):
@@ -114,44 +374,25 @@ def compare_excel_dicts(dict1, dict2):
     cell-level difference dictionary). We'll handle missing sheets separately.
     """
     differences = {}
+    for sheet, cell_coord, cell_subdiff in iter_excel_dict_differences(dict1, dict2):
+        if sheet not in differences:
+            differences[sheet] = {}
+        differences[sheet][cell_coord] = cell_subdiff
+    return differences
 
-    # Collect only the intersection of sheet names for cell-level diffs
-    common_sheets = set(dict1.keys()).intersection(dict2.keys())
-
-    for sheet in common_sheets:
-        sheet_diff = {}
-        sheet1_data = dict1[sheet]
-        sheet2_data = dict2[sheet]
-
-        # Collect all cell coords from both sheets in the intersection
-        all_cells = set(sheet1_data.keys()).union(sheet2_data.keys())
-        for cell_coord in all_cells:
-            cell1 = sheet1_data.get(cell_coord, {})
-            cell2 = sheet2_data.get(cell_coord, {})
-
-            val1 = cell1.get("value", None)
-            val2 = cell2.get("value", None)
-            formula1 = cell1.get("formula", "")
-            formula2 = cell2.get("formula", "")
-
-            cell_subdiff = {}
-
-            # Check value differences
-            if val1 != val2:
-                cell_subdiff["value"] = (val1, val2)
-
-            # Check formula differences
-            if formula1 != formula2:
-                cell_subdiff["formula"] = (formula1, formula2)
-
-            # If anything differs, record it
-            if cell_subdiff:
-                sheet_diff[cell_coord] = cell_subdiff
 
-        if sheet_diff:
-            differences[sheet] = sheet_diff
+def _row_major_order(sheet_data, coords):
+    """
+    Return the positions of a sheet's cells ordered by (row, column).
 
-    return differences
+    The cells are ordered by their row and column numbers, not by the
+    coordinate strings, which would list "A10" before "A2" and "AA1" before
+    "B1". A SheetData from read_excel_to_dict() already holds its cells in
+    row-major order, so that needs no sort at all.
+    """
+    if isinstance(sheet_data, SheetData):
+        return range(len(coords))
+    return sorted(range(len(coords)), key=lambda idx: coordinate_to_tuple(coords[idx]))
 
 
 def export_excel_dict_to_txt(excel_dict, file_path, source_excel_path=""):
@@ -180,19 +421,22 @@ def export_excel_dict_to_txt(excel_dict, file_path, source_excel_path=""):
     source_excel_path : str (optional)
         The original Excel file path, just for reference in the header.
     """
-    with open(file_path, 'w', encoding='utf-8') as f:
+    # Each sheet's listing is built as a list of lines and written in one go,
+    # through a 1 MiB buffer, rather than with one write() call per cell.
+    with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
         f.write(f"Contents of {source_excel_path}:\n")
         f.write("-" * 40 + "\n")
 
         for sheet_name in excel_dict:
             f.write(f"Sheet: {sheet_name}\n")
-            sheet_data = excel_dict[sheet_name]
-            # Sort the cell coordinates for a neat listing (e.g., A1, A2, A3, ...)
-            for cell_coord in sorted(sheet_data.keys()):
-                cell_info = sheet_data[cell_coord]
-                value_str = str(cell_info["value"])
-                formula_str = cell_info["formula"] if cell_info["formula"] else ""
-                f.write(f"  Cell {cell_coord} => value: {value_str}, formula: {formula_str}\n")
+            sheet_data = _as_sheet_data(excel_dict[sheet_name])
+            coords, values, formulas = sheet_data.coords, sheet_data.values, sheet_data.formulas
+            # List the cells row by row (A1, B1, ..., A2, B2, ...)
+            lines = [
+                f"  Cell {coords[idx]} => value: {values[idx]!s}, formula: {formulas[idx] or ''}\n"
+                for idx in _row_major_order(excel_dict[sheet_name], coords)
+            ]
+            f.write("".join(lines))
             f.write("\n")  # extra space between sheets
 
 
@@ -207,8 +451,11 @@ def export_comparison_to_txt(diff_dict, dict1, dict2, file_path,
 
     Parameters:
     -----------
-    diff_dict : dict
-        The differences dictionary returned by compare_excel_dicts().
+    diff_dict : dict or None
+        The differences dictionary returned by compare_excel_dicts(). Pass
+        None to have the differences streamed from
+        iter_excel_dict_differences(dict1, dict2) while the file is written,
+        without holding them all in memory.
     dict1, dict2 : dict
         The dictionaries returned by read_excel_to_dict() for each file.
     file_path : str
@@ -219,7 +466,9 @@ def export_comparison_to_txt(diff_dict, dict1, dict2, file_path,
     sheets1 = set(dict1.keys())
     sheets2 = set(dict2.keys())
 
-    with open(file_path, 'w', encoding='utf-8') as f:
+    # As in export_excel_dict_to_txt(), the lines are joined into large
+    # write() calls through a 1 MiB buffer.
+    with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
         f.write(f"Comparison summary between {excel1_name} and {excel2_name}\n")
         f.write("=" * 60 + "\n\n")
 
@@ -239,17 +488,37 @@ def export_comparison_to_txt(diff_dict, dict1, dict2, file_path,
 
         # 2) Cell-level differences in sheets that appear in both
         f.write("Cell-level differences in common sheets:\n")
-        if not diff_dict:
-            f.write("  No cell-level differences found.\n")
+        if diff_dict is None:
+            # Write the differences as they are found
+            records = iter_excel_dict_differences(dict1, dict2)
+        else:
+            records = ((sheet_name, cell_coord, changes)
+                       for sheet_name, cell_diffs in diff_dict.items()
+                       for cell_coord, changes in cell_diffs.items())
+
+        lines = []
+        current_sheet = None
+        found_any = False
+        for sheet_name, cell_coord, changes in records:
+            if not found_any or sheet_name != current_sheet:
+                if found_any:
+                    lines.append("\n")
+                lines.append(f"  Differences in sheet '{sheet_name}':\n")
+                current_sheet = sheet_name
+                found_any = True
+            lines.append(f"    Cell {cell_coord}:\n")
+            for attr, (val1, val2) in changes.items():
+                lines.append(f"      {attr} differs: '{val1}' vs. '{val2}'\n")
+            # Hand the text over in large blocks so memory use stays flat
+            # however many differences there are.
+            if len(lines) >= 10000:
+                f.write("".join(lines))
+                lines = []
+        if found_any:
+            lines.append("\n")
         else:
-            for sheet_name in diff_dict:
-                f.write(f"  Differences in sheet '{sheet_name}':\n")
-                cell_diffs = diff_dict[sheet_name]
-                for cell_coord, changes in cell_diffs.items():
-                    f.write(f"    Cell {cell_coord}:\n")
-                    for attr, (val1, val2) in changes.items():
-                        f.write(f"      {attr} differs: '{val1}' vs. '{val2}'\n")
-                f.write("\n")
+            lines.append("  No cell-level differences found.\n")
+        f.write("".join(lines))
 
         f.write("End of comparison.\n")
 
@@ -265,6 +534,9 @@ def create_dummy_excel_files():
       - At least one sheet that appears only in file1
       - At least one sheet that appears only in file2
     """
+    # Only the demo writes workbooks; reading goes through excel_handler._xlsx_reader
+    import openpyxl
+
     # --------------- File 1 ---------------
     wb1 = openpyxl.Workbook()
     ws1_1 = wb1.active  # First sheet
@@ -315,18 +587,40 @@ def create_dummy_excel_files():
     wb2.save("file2.xlsx")
 
 
+def _jakarta_timezone():
+    """
+    Return the Asia/Jakarta time zone used to name the output folder.
+
+    zoneinfo (standard library) imports faster than pytz and only loads the
+    one zone it is asked for. It relies on the system tz database (or the
+    tzdata package), so pytz remains the fallback where that is missing, as
+    well as on Python versions without zoneinfo.
+
+    Both are imported here rather than at module level: only main() needs a
+    time zone, so code that just reads or compares workbooks never loads
+    either of them.
+    """
+    try:
+        from zoneinfo import ZoneInfo  # Python 3.9+
+        return ZoneInfo('Asia/Jakarta')
+    except Exception:
+        pass
+    import pytz
+    return pytz.timezone('Asia/Jakarta')
+
+
 def main():
     # 1) Create dummy Excel files for demonstration:
     create_dummy_excel_files()
     print("[INFO] Created 'file1.xlsx' and 'file2.xlsx' for demonstration.\n")
 
     # 2) Read each file into dictionaries
-    dict1 = read_excel_to_dict("file1.xlsx")
-    dict2 = read_excel_to_dict("file2.xlsx")
+    #    (in parallel worker processes when the files are large)
+    dict1, dict2 = _read_excel_files_to_dicts(["file1.xlsx", "file2.xlsx"])
 
     # 3) Create an output folder named "output_{datetime_Jakarta}"
     #    Example: output_20250407_101530
-    jakarta_tz = pytz.timezone('Asia/Jakarta')
+    jakarta_tz = _jakarta_timezone()
     now_jakarta = datetime.datetime.now(tz=jakarta_tz)
     folder_name = now_jakarta.strftime("output_%Y%m%d_%H%M%S")
     os.makedirs(folder_name, exist_ok=True)
@@ -340,12 +634,11 @@ def main():
     export_excel_dict_to_txt(dict2, file2_out_path, "file2.xlsx")
     print("[INFO] Exported the contents of file1.xlsx and file2.xlsx to text files.\n")
 
-    # 5) Compare the two dictionaries at cell level (only in shared sheets)
-    diff = compare_excel_dicts(dict1, dict2)
-
-    # 6) Export comparison summary (sheet-level & cell-level differences) to a text file
+    # 5) Compare the two dictionaries at cell level (only in shared sheets) and
+    # 6) export the comparison summary (sheet-level & cell-level differences)
+    #    to a text file, writing each cell difference as it is found
     comparison_out_path = os.path.join(folder_name, "comparison_summary.txt")
-    export_comparison_to_txt(diff, dict1, dict2, comparison_out_path, "file1.xlsx", "file2.xlsx")
+    export_comparison_to_txt(None, dict1, dict2, comparison_out_path, "file1.xlsx", "file2.xlsx")
     print("[INFO] Exported comparison summary to 'comparison_summary.txt'.\n")
 
     # (Optional) If you want to keep the Excel files, leave them as is.
@@ -0,0 +1,166 @@
+"""
+compare_excel_data() and compare_excel_files_e2e() record whether two workbooks
+are identical in the "_metadata" of their result; the summary report is written
+from that verdict. The cells compare_excel_data() reports as differing must be
+the ones a plain dict diff of the two sheets finds.
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import openpyxl
+from openpyxl.utils import coordinate_to_tuple, get_column_letter
+
+from excel_handler.gemini import excel_handler_gemini as gemini
+
+
+def _quietly(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class EmptyWorkbookTest(unittest.TestCase):
+    """Workbooks with no worksheets have no common sheet and are never identical."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        # compare_excel_files_e2e() writes its reports under the current directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self._tmp.name)
+
+    def _chartsheet_only_workbook(self, name, title):
+        # A chartsheet holds no cells, so the workbook reads as {}
+        wb = openpyxl.Workbook()
+        wb.create_chartsheet(title)
+        wb.remove(wb.active)
+        path = os.path.join(self._tmp.name, name)
+        wb.save(path)
+        return path
+
+    def test_same_data_object(self):
+        data = {}
+        meta = _quietly(gemini.compare_excel_data, data, data)["_metadata"]
+        self.assertFalse(meta["identical"])
+
+    def test_identical_bytes(self):
+        file1 = self._chartsheet_only_workbook("empty1.xlsx", "Chart")
+        file2 = os.path.join(self._tmp.name, "empty2.xlsx")
+        shutil.copyfile(file1, file2)
+
+        results = _quietly(gemini.compare_excel_files_e2e, file1, file2, keep_files=False)
+        self.assertEqual(results["_metadata"]["sheets_common"], [])
+        self.assertFalse(results["_metadata"]["identical"])
+
+    def test_different_bytes(self):
+        file1 = self._chartsheet_only_workbook("empty1.xlsx", "Chart")
+        file2 = self._chartsheet_only_workbook("empty2.xlsx", "Other chart")
+
+        results = _quietly(gemini.compare_excel_files_e2e, file1, file2, keep_files=False)
+        self.assertFalse(results["_metadata"]["identical"])
+
+    def test_identical_worksheets(self):
+        wb = openpyxl.Workbook()
+        wb.active["A1"] = 1
+        file1 = os.path.join(self._tmp.name, "data1.xlsx")
+        file2 = os.path.join(self._tmp.name, "data2.xlsx")
+        wb.save(file1)
+        shutil.copyfile(file1, file2)
+
+        results = _quietly(gemini.compare_excel_files_e2e, file1, file2, keep_files=False)
+        self.assertTrue(results["_metadata"]["identical"])
+
+
+def _naive_sheet_diff(sheet_data1, sheet_data2):
+    # The straightforward dict diff compare_excel_data() started out as: every
+    # coordinate of either sheet, compared on str(value) and formula
+    missing = {"value": "[missing]", "formula": ""}
+    diff = {}
+    for cell_coord in set(sheet_data1) | set(sheet_data2):
+        cell_info1 = sheet_data1.get(cell_coord, missing)
+        cell_info2 = sheet_data2.get(cell_coord, missing)
+        if (str(cell_info1["value"]) != str(cell_info2["value"])
+                or cell_info1["formula"] != cell_info2["formula"]):
+            diff[cell_coord] = {"file1": cell_info1, "file2": cell_info2}
+    return diff
+
+
+def _cell(value, formula=""):
+    return {"value": value, "formula": formula}
+
+
+class CellDiffTest(unittest.TestCase):
+    """The merge-based sheet diff must report what a naive dict diff reports."""
+
+    def assertMatchesNaiveDiff(self, sheet1, sheet2):
+        results = _quietly(gemini.compare_excel_data, {"S": sheet1}, {"S": sheet2})
+        expected = _naive_sheet_diff(sheet1, sheet2)
+        self.assertEqual(results.get("S", {}), expected)
+        # ... listed in row-major order
+        coords = list(results.get("S", {}))
+        self.assertEqual(coords, sorted(coords, key=coordinate_to_tuple))
+        self.assertEqual(results["_metadata"]["differing_cell_count"], len(expected))
+        return results.get("S", {})
+
+    def test_cells_only_in_one_sheet(self):
+        sheet1 = {"A1": _cell(1), "B1": _cell("x"), "A10": _cell(2), "C3": _cell("[missing]")}
+        sheet2 = {"A1": _cell(1), "A2": _cell(5), "AA1": _cell("y"), "B2": _cell(None, "=A1")}
+        diff = self.assertMatchesNaiveDiff(sheet1, sheet2)
+        self.assertEqual(diff["B1"]["file2"], _cell("[missing]"))
+        self.assertEqual(diff["A2"]["file1"], _cell("[missing]"))
+        # A cell whose value reads "[missing]" looks the same as an absent one
+        self.assertNotIn("C3", diff)
+
+    def test_formula_only_changes(self):
+        sheet1 = {"A1": _cell(3, "=1+2"), "B1": _cell(3, "=1+2"), "C1": _cell(3)}
+        sheet2 = {"A1": _cell(3, "=2+1"), "B1": _cell(3, "=1+2"), "C1": _cell(3, "=3")}
+        diff = self.assertMatchesNaiveDiff(sheet1, sheet2)
+        self.assertEqual(list(diff), ["A1", "C1"])
+
+    def test_mixed_value_types(self):
+        sheet1 = {"A1": _cell(1), "B1": _cell(1), "C1": _cell(True), "D1": _cell(1),
+                  "E1": _cell(2.5), "F1": _cell(None), "G1": _cell("None")}
+        sheet2 = {"A1": _cell(1.0), "B1": _cell("1"), "C1": _cell(1), "D1": _cell(1),
+                  "E1": _cell("2.5"), "F1": _cell("None"), "G1": _cell(None)}
+        diff = self.assertMatchesNaiveDiff(sheet1, sheet2)
+        # 1 vs 1.0 and True vs 1 differ as text; 1 vs "1" does not
+        self.assertEqual(list(diff), ["A1", "C1"])
+
+    def test_signed_zero(self):
+        # 0.0 == -0.0, but their str() forms differ, so the cell is reported
+        sheet1 = {"A1": _cell(0.0), "B1": _cell(1.5)}
+        sheet2 = {"A1": _cell(-0.0), "B1": _cell(1.5)}
+        self.assertEqual(list(self.assertMatchesNaiveDiff(sheet1, sheet2)), ["A1"])
+        # Same layout but another cell changed, so the whole-sheet shortcut is skipped
+        sheet2["C1"] = _cell(1)
+        self.assertEqual(list(self.assertMatchesNaiveDiff(sheet1, sheet2)), ["A1", "C1"])
+
+    def test_identical_sheets(self):
+        sheet = {"A1": _cell(1), "B1": _cell("x", "=T(\"x\")")}
+        self.assertEqual(self.assertMatchesNaiveDiff(sheet, dict(sheet)), {})
+
+    def test_random_sheets(self):
+        rng = random.Random(1234)
+        values = [0, 1, 0.0, -0.0, 1.0, 2.5, "1", "a", "b", True, False, None, "[missing]", "[empty]"]
+        formulas = ["", "", "", "=A1", "=B2+1"]
+
+        def random_sheet():
+            return {get_column_letter(rng.randint(1, 30)) + str(rng.randint(1, 30)):
+                    _cell(rng.choice(values), rng.choice(formulas))
+                    for _ in range(rng.randint(0, 200))}
+
+        for _ in range(50):
+            sheet1 = random_sheet()
+            # Half the pairs share their layout, which takes the aligned fast path
+            sheet2 = ({coord: _cell(rng.choice(values), rng.choice(formulas)) for coord in sheet1}
+                      if rng.random() < 0.5 else random_sheet())
+            self.assertMatchesNaiveDiff(sheet1, sheet2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+The JSON outputs of the gemini handler: write_differences_to_jsonl() streams one
+difference per line, write_comparison_to_json() writes the whole
+compare_excel_data() result, and to_json_bytes()/from_json_bytes() hand parsed
+workbooks around without pickle. Each must read back to the data written.
+"""
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import openpyxl
+
+from excel_handler.gemini import excel_handler_gemini as gemini
+
+
+def _quietly(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _as_json_values(data):
+    # What a JSON round trip turns the data into: dates become their str() form,
+    # mappings (SheetData included) plain dicts
+    def default(obj):
+        return dict(obj.items()) if hasattr(obj, "items") else str(obj)
+    return json.loads(json.dumps(data, default=default))
+
+
+class JsonOutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+        self.file1 = self._path("book1.xlsx")
+        self.file2 = self._path("book2.xlsx")
+        for path, total, label in ((self.file1, 3, "Köln"), (self.file2, 4, "Zürich")):
+            wb = openpyxl.Workbook()
+            ws = wb.active
+            ws["A1"] = 1
+            ws["A2"] = total - 1
+            ws["A3"] = "=A1+A2"
+            ws["B1"] = label
+            ws["C1"] = datetime.datetime(2024, 5, total)
+            wb.create_sheet("Same")["A1"] = "unchanged"
+            wb.save(path)
+        self.data1 = _quietly(gemini.read_excel_file_data, self.file1)
+        self.data2 = _quietly(gemini.read_excel_file_data, self.file2)
+
+    def _path(self, *parts):
+        return os.path.join(self._tmp.name, *parts)
+
+    def test_jsonl_round_trip(self):
+        # The parent directories do not exist yet
+        output_path = self._path("reports", "jsonl", "diff.jsonl")
+        differences = _quietly(lambda: list(gemini.iter_excel_differences(self.data1, self.data2)))
+
+        count = _quietly(gemini.write_differences_to_jsonl, iter(differences), output_path)
+        self.assertEqual(count, len(differences))
+
+        with open(output_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records, _as_json_values([
+            {"sheet": sheet_name, "cell": cell_coord, **diff_entry}
+            for sheet_name, cell_coord, diff_entry in differences
+        ]))
+        self.assertEqual([record["cell"] for record in records], ["B1", "C1", "A2"])
+        self.assertEqual(records[0]["file2"], {"value": "Zürich", "formula": ""})
+        self.assertEqual(records[1]["file1"]["value"], "2024-05-03 00:00:00")
+
+    def test_comparison_json_round_trip(self):
+        output_path = self._path("reports", "json", "comparison.json")
+        comparison_results = _quietly(gemini.compare_excel_data, self.data1, self.data2)
+
+        self.assertTrue(_quietly(gemini.write_comparison_to_json, comparison_results, output_path))
+
+        with open(output_path, "rb") as f:
+            loaded = gemini.from_json_bytes(f.read())
+        self.assertEqual(loaded, _as_json_values(comparison_results))
+        self.assertEqual(loaded["_metadata"]["sheets_common"], ["Same", "Sheet"])
+        self.assertEqual(loaded["_metadata"]["differing_cell_count"], 3)
+        self.assertEqual(loaded["Sheet"]["A2"]["file2"], {"value": 3, "formula": ""})
+
+    def test_comparison_json_in_current_directory(self):
+        # A bare file name has no directory part to create
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self._tmp.name)
+        comparison_results = _quietly(gemini.compare_excel_data, self.data1, self.data2)
+
+        self.assertTrue(_quietly(gemini.write_comparison_to_json, comparison_results, "comparison.json"))
+        self.assertTrue(os.path.isfile("comparison.json"))
+
+    def test_workbook_json_round_trip(self):
+        loaded1 = gemini.from_json_bytes(gemini.to_json_bytes(self.data1))
+        loaded2 = gemini.from_json_bytes(gemini.to_json_bytes(self.data2))
+
+        self.assertEqual(loaded1, _as_json_values(self.data1))
+        self.assertEqual(loaded1["Sheet"]["A3"], {"value": "[empty]", "formula": "=A1+A2"})
+        # The loaded dicts compare the same way as the parsed workbooks
+        self.assertEqual(_quietly(gemini.compare_excel_data, loaded1, loaded2),
+                         _as_json_values(_quietly(gemini.compare_excel_data, self.data1, self.data2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
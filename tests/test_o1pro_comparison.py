@@ -0,0 +1,112 @@
+"""
+The o1pro handler finds cell differences with iter_excel_dict_differences(),
+which compare_excel_dicts() collects into a dict and export_comparison_to_txt()
+can also consume directly (diff_dict=None). Both routes must produce the same
+differences and the same comparison summary.
+"""
+
+import os
+import tempfile
+import unittest
+
+import openpyxl
+
+from excel_handler.o1pro import excel_handler_o1pro as o1pro
+
+
+def _naive_differences(dict1, dict2):
+    # The per-cell dict diff compare_excel_dicts() started out as
+    differences = {}
+    for sheet in set(dict1).intersection(dict2):
+        sheet_diff = {}
+        for cell_coord in set(dict1[sheet]).union(dict2[sheet]):
+            cell1 = dict1[sheet].get(cell_coord, {})
+            cell2 = dict2[sheet].get(cell_coord, {})
+            cell_subdiff = {}
+            if cell1.get("value") != cell2.get("value"):
+                cell_subdiff["value"] = (cell1.get("value"), cell2.get("value"))
+            if cell1.get("formula", "") != cell2.get("formula", ""):
+                cell_subdiff["formula"] = (cell1.get("formula", ""), cell2.get("formula", ""))
+            if cell_subdiff:
+                sheet_diff[cell_coord] = cell_subdiff
+        if sheet_diff:
+            differences[sheet] = sheet_diff
+    return differences
+
+
+class StreamingComparisonTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self._tmp.name, name)
+
+    def _workbook(self, name, version):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws["A1"] = 10
+        ws["A2"] = 20 + version   # changed value
+        ws["A3"] = "=SUM(A1, A2)"
+        ws["B2"] = f"=A2*{version + 1}"   # changed formula
+        ws["C1"] = 1 if version == 1 else 1.0   # equal as numbers
+        if version == 1:
+            ws["D4"] = "only in file 1"
+        else:
+            ws["E5"] = "only in file 2"
+            ws["F6"] = "=E5"
+
+        # Same layout in both files, so the position-by-position pairing is used;
+        # enough differences that the summary is written in several blocks
+        wide = wb.create_sheet("Wide")
+        for row in range(1, 6001):
+            for col in range(1, 3):
+                wide.cell(row=row, column=col, value=row * col + (version if col == 2 else 0))
+
+        wb.create_sheet("Unchanged")["A1"] = "same"
+        wb.create_sheet(f"Only{version}")["A1"] = version
+        path = self._path(name)
+        wb.save(path)
+        return o1pro.read_excel_to_dict(path)
+
+    def test_streamed_summary_matches_collected_differences(self):
+        dict1 = self._workbook("file1.xlsx", 1)
+        dict2 = self._workbook("file2.xlsx", 2)
+
+        diff_dict = o1pro.compare_excel_dicts(dict1, dict2)
+        self.assertEqual(diff_dict, _naive_differences(dict1, dict2))
+        self.assertEqual(set(diff_dict), {"Data", "Wide"})
+        self.assertEqual(diff_dict["Data"]["A2"], {"value": (21, 22)})
+        self.assertEqual(diff_dict["Data"]["D4"], {"value": ("only in file 1", None)})
+        self.assertEqual(diff_dict["Data"]["F6"], {"formula": ("", "=E5")})
+        self.assertNotIn("C1", diff_dict["Data"])
+        self.assertEqual(len(diff_dict["Wide"]), 6000)
+
+        collected_path = self._path("collected.txt")
+        streamed_path = self._path("streamed.txt")
+        o1pro.export_comparison_to_txt(diff_dict, dict1, dict2, collected_path, "file1.xlsx", "file2.xlsx")
+        o1pro.export_comparison_to_txt(None, dict1, dict2, streamed_path, "file1.xlsx", "file2.xlsx")
+
+        with open(collected_path, encoding="utf-8") as f:
+            collected = f.read()
+        with open(streamed_path, encoding="utf-8") as f:
+            streamed = f.read()
+        self.assertEqual(streamed, collected)
+        self.assertIn("    Cell B2:\n      formula differs: '=A2*2' vs. '=A2*3'\n", streamed)
+        self.assertTrue(streamed.endswith("End of comparison.\n"))
+
+    def test_no_differences(self):
+        dict1 = self._workbook("file1.xlsx", 1)
+
+        streamed_path = self._path("streamed.txt")
+        o1pro.export_comparison_to_txt(None, dict1, dict1, streamed_path, "a.xlsx", "b.xlsx")
+        with open(streamed_path, encoding="utf-8") as f:
+            streamed = f.read()
+        self.assertIn("  No sheet-level differences found (same sheet names).\n", streamed)
+        self.assertIn("  No cell-level differences found.\n", streamed)
+
+
+if __name__ == "__main__":
+    unittest.main()
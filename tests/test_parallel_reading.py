@@ -0,0 +1,120 @@
+"""
+Large workbooks are parsed in worker processes: the sheets of one workbook
+(_read_excel_file_data_xml) and the two files of a comparison
+(_read_excel_files_data). A parallel read must return exactly what the
+sequential read returns, and fall back to reading sequentially when the
+worker processes cannot be started.
+
+The thresholds and the CPU count are patched so the small workbooks built here
+take the parallel paths on any machine.
+"""
+
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import openpyxl
+
+from excel_handler.gemini import excel_handler_gemini as gemini
+
+
+def _read_quietly(func, *args, **kwargs):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = func(*args, **kwargs)
+    return result, output.getvalue()
+
+
+def _as_dicts(data):
+    return {sheet: dict(cells.items()) for sheet, cells in data.items()}
+
+
+def _write_workbook(path, seed):
+    wb = openpyxl.Workbook()
+    for sheet_idx in range(3):
+        ws = wb.active if sheet_idx == 0 else wb.create_sheet()
+        ws.title = f"Sheet{sheet_idx + 1}"
+        for row_idx in range(1, 21):
+            ws.cell(row=row_idx, column=1, value=row_idx * seed + sheet_idx)
+            ws.cell(row=row_idx, column=2, value=f"text {row_idx} {seed}")
+            ws.cell(row=row_idx, column=3, value=f"=A{row_idx}*2")
+        ws["D1"] = 2.5
+        ws["D2"] = datetime.datetime(2024, 1, seed)
+    wb.save(path)
+
+
+class ParallelSheetReadingTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "book.xlsx")
+        _write_workbook(self.path, 1)
+        self.sequential, _ = _read_quietly(gemini._read_excel_file_data_xml, self.path)
+
+    def _patched_for_parallel(self):
+        stack = contextlib.ExitStack()
+        stack.enter_context(mock.patch.object(gemini.os, "cpu_count", return_value=2))
+        stack.enter_context(mock.patch.object(gemini, "_PARALLEL_MIN_SHEET_BYTES", 0))
+        return stack
+
+    def test_parallel_read_matches_sequential_read(self):
+        with self._patched_for_parallel():
+            parallel, output = _read_quietly(gemini._read_excel_file_data_xml, self.path)
+
+        self.assertIn("in parallel worker processes", output)
+        self.assertNotIn("sequentially", output)
+        self.assertEqual(list(parallel), ["Sheet1", "Sheet2", "Sheet3"])
+        self.assertEqual(_as_dicts(parallel), _as_dicts(self.sequential))
+
+    def test_falls_back_when_workers_cannot_start(self):
+        with self._patched_for_parallel(), \
+                mock.patch.object(gemini, "ProcessPoolExecutor", side_effect=OSError("no processes")):
+            data, output = _read_quietly(gemini._read_excel_file_data_xml, self.path)
+
+        self.assertIn("Parsing sheets sequentially", output)
+        self.assertEqual(_as_dicts(data), _as_dicts(self.sequential))
+
+
+class ParallelFileReadingTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.paths = [os.path.join(self._tmp.name, f"book{seed}.xlsx") for seed in (1, 2)]
+        for seed, path in enumerate(self.paths, 1):
+            _write_workbook(path, seed)
+        self.sequential = [_read_quietly(gemini.read_excel_file_data, path)[0] for path in self.paths]
+
+    def _patched_for_parallel(self):
+        stack = contextlib.ExitStack()
+        stack.enter_context(mock.patch.object(gemini.os, "cpu_count", return_value=2))
+        stack.enter_context(mock.patch.object(gemini, "_PARALLEL_MIN_FILE_BYTES", 0))
+        stack.enter_context(mock.patch.dict(os.environ, {gemini._PARALLEL_IO_ENV: "1"}))
+        return stack
+
+    def test_parallel_read_matches_sequential_read(self):
+        with self._patched_for_parallel():
+            parallel, output = _read_quietly(gemini._read_excel_files_data, self.paths)
+
+        self.assertIn("Reading 2 files in parallel worker processes", output)
+        self.assertNotIn("sequentially", output)
+        self.assertEqual([_as_dicts(data) for data in parallel],
+                         [_as_dicts(data) for data in self.sequential])
+
+    def test_falls_back_when_workers_cannot_start(self):
+        with self._patched_for_parallel(), \
+                mock.patch.object(gemini, "ProcessPoolExecutor", side_effect=OSError("no processes")):
+            data, output = _read_quietly(gemini._read_excel_files_data, self.paths)
+
+        self.assertIn("Reading files sequentially", output)
+        self.assertEqual([_as_dicts(book) for book in data],
+                         [_as_dicts(book) for book in self.sequential])
+
+
+if __name__ == "__main__":
+    unittest.main()
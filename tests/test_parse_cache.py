@@ -0,0 +1,181 @@
+"""
+read_excel_file_data(use_cache=True) pickles each parsed workbook under .cache/,
+keyed by the workbook's path and contents. An unchanged workbook must come back
+from the cache, any edit must miss it, and the command line only caches when
+asked to with --cache.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import openpyxl
+
+from excel_handler.gemini import excel_handler_gemini as gemini
+
+
+def _quietly(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _as_dicts(data):
+    return {sheet: dict(cells.items()) for sheet, cells in data.items()}
+
+
+class ParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        # The cache lives in .cache/ under the current directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self._tmp.name)
+
+    def _write_workbook(self, path, value):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        wb = openpyxl.Workbook()
+        wb.active["A1"] = value
+        wb.active["B1"] = "=A1*2"
+        wb.save(path)
+
+    def _cache_entries(self):
+        if not os.path.isdir(gemini._CACHE_DIR):
+            return []
+        return sorted(os.listdir(gemini._CACHE_DIR))
+
+    def _read(self, path, **kwargs):
+        # Counts the real parses, so a cache hit can be told from a miss
+        parse = mock.patch.object(gemini, "_read_excel_file_data_uncached",
+                                  wraps=gemini._read_excel_file_data_uncached)
+        with parse as uncached:
+            data = _quietly(gemini.read_excel_file_data, path, use_cache=True, **kwargs)
+        return data, uncached.call_count
+
+    def test_unchanged_workbook_hits_the_cache(self):
+        self._write_workbook("book.xlsx", 1)
+
+        first, parses = self._read("book.xlsx")
+        self.assertEqual(parses, 1)
+        self.assertEqual(len(self._cache_entries()), 1)
+
+        second, parses = self._read("book.xlsx")
+        self.assertEqual(parses, 0)
+        self.assertEqual(_as_dicts(second), _as_dicts(first))
+
+    def test_edited_workbook_misses_the_cache(self):
+        self._write_workbook("book.xlsx", 1)
+        self._read("book.xlsx")
+        old_entries = self._cache_entries()
+
+        self._write_workbook("book.xlsx", 2)
+        data, parses = self._read("book.xlsx")
+        self.assertEqual(parses, 1)
+        self.assertEqual(data["Sheet"]["A1"], {"value": 2, "formula": ""})
+        # The entry for the old contents is dropped rather than kept alongside
+        self.assertEqual(len(self._cache_entries()), 1)
+        self.assertNotEqual(self._cache_entries(), old_entries)
+
+    def test_precomputed_digest_is_used_as_the_key(self):
+        self._write_workbook("book.xlsx", 1)
+        digest = gemini._file_digest("book.xlsx")
+
+        with mock.patch.object(gemini, "_file_digest", wraps=gemini._file_digest) as file_digest:
+            self._read("book.xlsx", content_digest=digest)
+            _, parses = self._read("book.xlsx", content_digest=digest)
+        self.assertEqual(file_digest.call_count, 0)
+        self.assertEqual(parses, 0)
+
+    def test_same_name_in_different_folders(self):
+        self._write_workbook(os.path.join("v1", "report.xlsx"), 1)
+        self._write_workbook(os.path.join("v2", "report.xlsx"), 2)
+
+        self._read(os.path.join("v1", "report.xlsx"))
+        self._read(os.path.join("v2", "report.xlsx"))
+        self.assertEqual(len(self._cache_entries()), 2)
+
+        data, parses = self._read(os.path.join("v1", "report.xlsx"))
+        self.assertEqual(parses, 0)
+        self.assertEqual(data["Sheet"]["A1"]["value"], 1)
+
+    def test_corrupt_entry_is_reparsed(self):
+        self._write_workbook("book.xlsx", 1)
+        self._read("book.xlsx")
+        cache_path = gemini._cache_path("book.xlsx")
+        with open(cache_path, "wb") as f:
+            f.write(b"not a pickle")
+
+        data, parses = self._read("book.xlsx")
+        self.assertEqual(parses, 1)
+        self.assertEqual(data["Sheet"]["A1"]["value"], 1)
+        # ... and the entry is rewritten, so the next read hits it again
+        _, parses = self._read("book.xlsx")
+        self.assertEqual(parses, 0)
+
+    def test_stale_entries_are_evicted(self):
+        self._write_workbook("book.xlsx", 1)
+        os.makedirs(gemini._CACHE_DIR)
+        # An entry for earlier contents of this path, and one written by another cache version
+        stale_contents = f"{gemini._cache_path_prefix('book.xlsx')}.{'0' * 32}.v{gemini._CACHE_VERSION}.pkl"
+        stale_version = f"{gemini._cache_path_prefix('book.xlsx')}.{'1' * 32}.v{gemini._CACHE_VERSION + 1}.pkl"
+        other_book = f"{gemini._cache_path_prefix('other.xlsx')}.{'0' * 32}.v{gemini._CACHE_VERSION}.pkl"
+        for entry in (stale_contents, stale_version, other_book):
+            open(os.path.join(gemini._CACHE_DIR, entry), "wb").close()
+
+        self._read("book.xlsx")
+        self.assertEqual(self._cache_entries(),
+                         sorted([os.path.basename(gemini._cache_path("book.xlsx")), other_book]))
+
+    def test_cache_is_off_by_default(self):
+        self._write_workbook("book.xlsx", 1)
+
+        _quietly(gemini.read_excel_file_data, "book.xlsx")
+        self.assertEqual(self._cache_entries(), [])
+
+
+class CommandLineCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self._tmp.name)
+        for name, value in (("a.xlsx", 1), ("b.xlsx", 2)):
+            wb = openpyxl.Workbook()
+            wb.active["A1"] = value
+            wb.save(name)
+
+    def _run_main(self, *extra_args, demo=False):
+        argv = ["excel_handler_gemini", "--print-json", "none"]
+        if not demo:
+            argv += ["--file1", "a.xlsx", "--file2", "b.xlsx"]
+        with mock.patch.object(sys, "argv", argv + list(extra_args)):
+            _quietly(gemini.main)
+
+    def test_no_cache_without_the_flag(self):
+        self._run_main()
+        self.assertFalse(os.path.exists(gemini._CACHE_DIR))
+
+    def test_cache_flag_enables_the_cache(self):
+        self._run_main("--cache")
+        self.assertEqual(len(os.listdir(gemini._CACHE_DIR)), 2)
+
+    def test_demo_cleanup_without_the_flag(self):
+        # There are no cache entries to remove, so the demo files are not hashed for them
+        with mock.patch.object(gemini, "_cache_path", wraps=gemini._cache_path) as cache_path:
+            self._run_main(demo=True)
+        self.assertEqual(cache_path.call_count, 0)
+        self.assertFalse(os.path.exists("demo_excel_1.xlsx"))
+
+    def test_demo_cleanup_with_the_flag(self):
+        self._run_main("--cache", demo=True)
+        self.assertFalse(os.path.exists("demo_excel_1.xlsx"))
+        self.assertFalse(os.path.exists(gemini._CACHE_DIR))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+The gemini reader has two paths: the streaming zipfile/iterparse reader and the
+openpyxl fallback it drops to when the streaming parse fails. Both must report
+the same cells, or a report would depend on which path happened to run.
+
+The o1pro reader streams the sheet XML the same way, and must report what two
+openpyxl loads of the workbook (formulas and cached values) would.
+"""
+
+import contextlib
+import io
+import os
+import re
+import tempfile
+import unittest
+import zipfile
+
+import datetime
+
+import openpyxl
+from openpyxl.worksheet.formula import ArrayFormula, DataTableFormula
+
+from excel_handler.gemini import excel_handler_gemini as gemini
+from excel_handler.o1pro import excel_handler_o1pro as o1pro
+
+
+# Cells openpyxl cannot write itself: shared formulas (master and dependents),
+# an array formula with a cached result, a data-table formula, an empty <f/>,
+# and formula cells without a cached value
+_FORMULA_SHEET_DATA = (
+    '<sheetData>'
+    '<row r="1">'
+    '<c r="A1"><v>1</v></c>'
+    '<c r="B1"><f t="array" ref="B1:B2">A1:A2*2</f><v>2</v></c>'
+    '<c r="C1"><f t="shared" ref="C1:C3" si="0">A1+1</f><v>2</v></c>'
+    '<c r="D1"><f/><v>0</v></c>'
+    '<c r="E1"><f>A1*3</f></c>'
+    '</row>'
+    '<row r="2">'
+    '<c r="A2"><v>2</v></c>'
+    '<c r="B2"><v>4</v></c>'
+    '<c r="C2"><f t="shared" si="0"/><v>3</v></c>'
+    '<c r="D2"><f t="dataTable" ref="D2:D3" dt2D="0" dtr="0" r1="A1"/><v>7</v></c>'
+    '</row>'
+    '<row r="3">'
+    '<c r="C3"><f t="shared" si="0"/></c>'
+    '<c r="D3"><v>8</v></c>'
+    '<c r="E3" t="str"><f t="shared" si="1"/><v>x</v></c>'
+    '</row>'
+    '</sheetData>'
+)
+
+
+def _inject_sheet_data(base_path, path, sheet_data, date1904=False):
+    # Copies the workbook at base_path to path with the first sheet's <sheetData>
+    # replaced by sheet_data
+    with zipfile.ZipFile(base_path) as src, zipfile.ZipFile(path, "w") as dst:
+        for name in src.namelist():
+            data = src.read(name)
+            if name == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb"<sheetData\s*/>|<sheetData>.*</sheetData>",
+                              sheet_data.encode(), data, flags=re.S)
+            elif name == "xl/workbook.xml" and date1904:
+                data = data.replace(b"<workbookPr/>", b'<workbookPr date1904="1"/>')
+            dst.writestr(name, data)
+
+
+def _read_both(filepath):
+    with contextlib.redirect_stdout(io.StringIO()):
+        streamed = gemini._read_excel_file_data_xml(filepath)
+        fallback = gemini._read_excel_file_data_openpyxl(filepath)
+    as_dicts = lambda data: {sheet: dict(cells.items()) for sheet, cells in data.items()}
+    return as_dicts(streamed), as_dicts(fallback)
+
+
+class ReaderParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self._tmp.name, name)
+
+    def test_openpyxl_written_array_formula(self):
+        path = self._path("array.xlsx")
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws["A1"] = 1
+        ws["A2"] = 2
+        ws["B2"] = ArrayFormula("B2:B3", "=SUM(A1:A2*2)")
+        ws["C1"] = "=A1+A2"
+        # A quote-prefixed text cell that starts with '=' is text, not a formula
+        ws["D1"] = "=abc"
+        ws["D1"].data_type = "s"
+        ws["D1"].quotePrefix = True
+        wb.save(path)
+
+        streamed, fallback = _read_both(path)
+        self.assertEqual(streamed, fallback)
+        self.assertEqual(streamed["Sheet"]["D1"], {"value": "=abc", "formula": ""})
+
+    def test_shared_array_and_data_table_formulas(self):
+        base_path = self._path("base.xlsx")
+        wb = openpyxl.Workbook()
+        wb.active.title = "Formulas"
+        wb.active["A1"] = 1
+        wb.save(base_path)
+
+        path = self._path("formulas.xlsx")
+        _inject_sheet_data(base_path, path, _FORMULA_SHEET_DATA)
+
+        streamed, fallback = _read_both(path)
+        self.assertEqual(streamed, fallback)
+        cells = streamed["Formulas"]
+        self.assertEqual(cells["C2"], {"value": 3, "formula": "=A2+1"})
+        self.assertEqual(cells["B1"]["formula"], "")
+        self.assertEqual(cells["D2"]["formula"], "")
+        self.assertEqual(cells["D1"]["formula"], "=")
+
+    def test_rows_out_of_order(self):
+        base_path = self._path("base.xlsx")
+        wb = openpyxl.Workbook()
+        wb.active.title = "Formulas"
+        wb.active["A1"] = 1
+        wb.save(base_path)
+
+        unordered_path = self._path("unordered.xlsx")
+        _inject_sheet_data(base_path, unordered_path, (
+            '<sheetData>'
+            '<row r="3"><c r="B3"><v>3</v></c><c r="A3"><v>5</v></c><c r="A3"><v>4</v></c></row>'
+            '<row r="1"><c r="A1"><f>B3*2</f><v>6</v></c></row>'
+            '</sheetData>'
+        ))
+        ordered_path = self._path("ordered.xlsx")
+        _inject_sheet_data(base_path, ordered_path, (
+            '<sheetData>'
+            '<row r="1"><c r="A1"><f>B3*2</f><v>6</v></c></row>'
+            '<row r="3"><c r="A3"><v>4</v></c><c r="B3"><v>3</v></c></row>'
+            '</sheetData>'
+        ))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            unordered = gemini._read_excel_file_data_xml(unordered_path)
+            ordered = gemini._read_excel_file_data_xml(ordered_path)
+        cells = unordered["Formulas"]
+        self.assertEqual(list(cells), ["A1", "A3", "B3"])
+        self.assertIn("A1", cells)
+        self.assertEqual(cells["A1"], {"value": 6, "formula": "=B3*2"})
+        self.assertEqual(cells["A3"], {"value": 4, "formula": ""})
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            comparison = gemini.compare_excel_data(unordered, ordered)
+        self.assertTrue(comparison["_metadata"]["identical"])
+
+
+def _comparable(value):
+    # openpyxl's formula objects have no __eq__ of their own
+    if isinstance(value, ArrayFormula):
+        return ("ArrayFormula", value.ref, value.text)
+    if isinstance(value, DataTableFormula):
+        return ("DataTableFormula", dict(value))
+    return (type(value).__name__, value)
+
+
+def _read_with_openpyxl(filepath):
+    # What read_excel_to_dict() is documented to return, from two openpyxl loads
+    wb_formulas = openpyxl.load_workbook(filepath)
+    wb_values = openpyxl.load_workbook(filepath, data_only=True)
+    expected = {}
+    for ws_formulas in wb_formulas.worksheets:
+        ws_values = wb_values[ws_formulas.title]
+        cells = {}
+        for row in ws_formulas.iter_rows():
+            for cell in row:
+                formula = cell.value if cell.data_type == "f" else ""
+                value = ws_values[cell.coordinate].value
+                if value is None and formula == "":
+                    continue
+                cells[cell.coordinate] = (_comparable(value), _comparable(formula))
+        expected[ws_formulas.title] = cells
+    return expected
+
+
+def _read_o1pro(filepath):
+    return {sheet: {coord: (_comparable(cell["value"]), _comparable(cell["formula"]))
+                    for coord, cell in cells.items()}
+            for sheet, cells in o1pro.read_excel_to_dict(filepath).items()}
+
+
+class O1proReaderParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self._tmp.name, name)
+
+    def _base_workbook(self):
+        path = self._path("base.xlsx")
+        wb = openpyxl.Workbook()
+        wb.active.title = "Formulas"
+        wb.active["A1"] = 1
+        ws = wb.create_sheet("Types")
+        ws["A1"] = datetime.datetime(2024, 1, 2, 3, 4)
+        ws["B1"] = True
+        ws["C1"] = datetime.timedelta(hours=5)
+        ws["C1"].number_format = "[h]:mm:ss"
+        ws["D1"] = 1.5
+        ws["E1"] = "text"
+        ws["E2"] = "text"
+        ws["A3"] = ArrayFormula("A3:A4", "=SUM(B1:B2)")
+        ws["B3"] = "=A1+1"
+        wb.save(path)
+        return path
+
+    def test_shared_array_and_data_table_formulas(self):
+        path = self._path("formulas.xlsx")
+        sheet_data = _FORMULA_SHEET_DATA.replace(
+            "</sheetData>",
+            '<row r="5"><c r="A5" t="inlineStr"><is><t>inline</t></is></c>'
+            '<c r="B5" t="b"><v>0</v></c><c r="C5" s="0"/></row></sheetData>')
+        _inject_sheet_data(self._base_workbook(), path, sheet_data)
+
+        actual = _read_o1pro(path)
+        self.assertEqual(actual, _read_with_openpyxl(path))
+        self.assertEqual(list(actual), ["Formulas", "Types"])
+        self.assertEqual(actual["Formulas"]["C2"], (("int", 3), ("str", "=A2+1")))
+        self.assertNotIn("C5", actual["Formulas"])
+
+    def test_rows_out_of_order(self):
+        path = self._path("unordered.xlsx")
+        sheet_data = (
+            '<sheetData>'
+            '<row r="3"><c r="B3"><v>3</v></c><c r="A3" s="0"/><c r="A3"><v>4</v></c></row>'
+            '<row r="1"><c r="A1"><f>B3*2</f><v>6</v></c><c r="B1" s="0"/></row>'
+            '</sheetData>'
+        )
+        _inject_sheet_data(self._base_workbook(), path, sheet_data)
+
+        actual = _read_o1pro(path)
+        self.assertEqual(actual, _read_with_openpyxl(path))
+        self.assertEqual(list(o1pro.read_excel_to_dict(path)["Formulas"]), ["A1", "A3", "B3"])
+
+    def test_1904_dates(self):
+        path = self._path("dates1904.xlsx")
+        _inject_sheet_data(self._base_workbook(), path, _FORMULA_SHEET_DATA, date1904=True)
+
+        self.assertEqual(_read_o1pro(path), _read_with_openpyxl(path))
+
+    def test_sheet_names(self):
+        path = self._base_workbook()
+
+        self.assertEqual(list(o1pro.read_excel_to_dict(path, sheet_names=["Types"])), ["Types"])
+        with self.assertRaises(KeyError):
+            o1pro.read_excel_to_dict(path, sheet_names=["Missing"])
+
+    def test_chartsheets_are_skipped(self):
+        path = self._path("chart.xlsx")
+        wb = openpyxl.Workbook()
+        wb.active["A1"] = 1
+        wb.create_chartsheet("Chart")
+        wb.save(path)
+
+        self.assertEqual(list(o1pro.read_excel_to_dict(path)), ["Sheet"])
+
+
+if __name__ == "__main__":
+    unittest.main()